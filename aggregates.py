@@ -0,0 +1,157 @@
+import numpy as np
+import pandas as pd
+
+import schema
+import status_classes
+import time_buckets
+
+# ================= COUNT CUBE =================
+# Alert counts per (day, system, status, assignee), built once when the data
+# loads. Roles are resolved from assignees at query time so role edits never
+# invalidate the cube. Creates and updates queue +1/-1 deltas, which are
+# compacted into a small separate delta frame; queries add the delta's slice
+# to the cube's, and the delta is only folded into the cube once it outgrows
+# FOLD_MIN_ROWS and 1/FOLD_RATIO of the cube.
+# Every compacted cube row also carries its integer month bucket, so month
+# lists and month slices never format or parse dates.
+DIMENSIONS = ["day", "systemName", "status", "currentAssignee"]
+
+FOLD_MIN_ROWS = 4096
+FOLD_RATIO    = 8
+
+
+def _keys(df):
+    keys = pd.DataFrame({
+        "day":             df["deviationTime"].to_numpy().astype("datetime64[D]"),
+        "systemName":      df["systemName"].to_numpy(),
+        "status":          df["status"].to_numpy(),
+        "currentAssignee": df["currentAssignee"].to_numpy(),
+    })
+    return keys[~np.isnat(keys["day"].to_numpy())]
+
+
+def _compact(frame):
+    counts = (
+        frame
+        .groupby(DIMENSIONS, observed=True, dropna=False, sort=False)["count"]
+        .sum()
+        .reset_index()
+    )
+    counts = counts[counts["count"] != 0]
+    counts = schema.coerce_alert_schema(counts)
+    counts = counts.sort_values("day", kind="stable", ignore_index=True)
+    counts["month"] = time_buckets.month_codes(counts["day"].to_numpy())
+    return counts
+
+
+def build_cube(df):
+    return {
+        "counts":  _compact(_keys(df).assign(count=1)),
+        "delta":   None,
+        "pending": [],
+    }
+
+
+def apply_delta(cube, removed=(), added=()):
+    # Rows arrive as dicts from the alert store
+    for rows, sign in ((removed, -1), (added, 1)):
+        if len(rows):
+            cube["pending"].append(_keys(pd.DataFrame(list(rows))).assign(count=sign))
+
+
+def merge_counts(frames):
+    # Sums count frames (cube slices, deltas, engine results) into one
+    # compacted, day-ordered frame
+    return _compact(schema.concat_frames(frames, ignore_index=True))
+
+
+def _delta(cube):
+    # Queued deltas are compacted among themselves, which costs O(delta);
+    # the cube itself is only rewritten once the delta has grown large
+    if cube["pending"]:
+        frames = [cube["delta"]] if cube["delta"] is not None else []
+        cube["delta"]   = merge_counts(frames + cube["pending"])
+        cube["pending"] = []
+        if len(cube["delta"]) > max(FOLD_MIN_ROWS, len(cube["counts"]) // FOLD_RATIO):
+            _fold(cube)
+    return cube["delta"]
+
+
+def _fold(cube):
+    if cube["delta"] is not None:
+        cube["counts"] = merge_counts([cube["counts"], cube["delta"]])
+        cube["delta"]  = None
+
+
+def cube_counts(cube):
+    # The whole cube with every delta folded in
+    _delta(cube)
+    _fold(cube)
+    return cube["counts"]
+
+
+# ================= SLICING =================
+def _day(value):
+    return np.datetime64(pd.Timestamp(value).date(), "D")
+
+
+def slice_days(counts, start_date, end_date):
+    # Whole days, inclusive at both ends; counts are kept in day order
+    days = counts["day"].to_numpy()
+    lo = days.searchsorted(_day(start_date), side="left")
+    hi = days.searchsorted(_day(end_date), side="right")
+    return counts.iloc[lo:hi]
+
+
+def _slice(counts, start_date, end_date, system):
+    counts = slice_days(counts, start_date, end_date)
+    if system != "All":
+        counts = counts[counts["systemName"] == system]
+    return counts
+
+
+def slice_cube(cube, start_date, end_date, system="All"):
+    # A key may appear in both the cube's and the delta's rows (with the
+    # delta's count possibly negative); every reader sums counts, so the
+    # two day-ordered slices are only interleaved, not regrouped
+    counts = _slice(cube["counts"], start_date, end_date, system)
+    delta  = _delta(cube)
+    if delta is None:
+        return counts
+    delta = _slice(delta, start_date, end_date, system)
+    if not len(delta):
+        return counts
+    merged = schema.concat_frames([counts, delta], ignore_index=True)
+    # A stable sort of two sorted runs is a linear merge
+    return merged.sort_values("day", kind="stable", ignore_index=True)
+
+
+def only_active(counts):
+    return counts[status_classes.is_active(counts["status"])]
+
+
+def total(counts):
+    return int(counts["count"].sum())
+
+
+def sum_by(counts, by):
+    return counts.groupby(by, observed=True)["count"].sum()
+
+
+def sum_by_role(counts, people_roles):
+    roles = schema.remap_categorical(counts["currentAssignee"], people_roles, default="Other")
+    return counts["count"].groupby(roles.to_numpy()).sum()
+
+
+def status_class_counts(counts):
+    by_status = sum_by(counts, "status")
+    bits      = np.array([status_classes.label_bits(s) for s in by_status.index], dtype=np.uint16)
+    return {
+        name: int(by_status.to_numpy()[(bits & bit) != 0].sum())
+        for name, bit in status_classes.BITS.items()
+    }
+
+
+def month_buckets(counts):
+    # Distinct month codes present, ascending
+    return time_buckets.distinct_sorted(counts["month"].to_numpy())
@@ -0,0 +1,247 @@
+import json
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+import alert_store
+import data_loader
+
+# ================= ALERT JOURNAL =================
+# Created and updated alerts are persisted next to the dataset's Parquet
+# sidecar as an append-only JSON-lines log, one full row version per line.
+# Loading a dataset replays the log into the store, so edits survive a
+# restart without ever rewriting the export itself. Names are written in
+# their raw form and mapped on replay, so a later session with different
+# display names still reads them correctly.
+#
+# Every session on a dataset appends to the same log, so each line records
+# whether it created an alert or updated one. A create always starts a new
+# alert, even if an older log handed out the same requestID twice; updates
+# belong to the latest alert with their requestID. New requestIDs come from
+# a counter shared by those sessions, and after a restart the IDs already in
+# the log put the counter past them.
+#
+# Older versions of the same alert are dropped by a background rewrite once
+# the log is mostly superseded lines.
+NAME_COLUMNS = {
+    "systemName":        "system",
+    "currentAssignee":   "assignee",
+    "lastActionTakenBy": "assignee",
+}
+OP_FIELD = "_op"
+COMPACT_MIN_LINES = 1000
+COMPACT_RATIO     = 2
+
+_shared = {}
+_shared_lock = threading.Lock()
+
+
+def journal_path(key):
+    return os.path.join(data_loader.SIDECAR_DIR, f"{key}.journal.jsonl")
+
+
+def _shared_state(path):
+    # One file lock and one requestID counter per journal, for every session
+    with _shared_lock:
+        return _shared.setdefault(path, {
+            "lock":       threading.Lock(),
+            "id_counter": alert_store.new_id_counter(),
+        })
+
+
+def open_journal(key, system_mapping, assignee_mapping):
+    path = journal_path(key)
+    shared = _shared_state(path)
+    forward = {"system": system_mapping, "assignee": assignee_mapping}
+    return {
+        "path":       path,
+        "lock":       shared["lock"],
+        "id_counter": shared["id_counter"],
+        "forward":    forward,
+        # First raw name wins when two raw names share a display name
+        "backward":   {
+            kind: {display: raw for raw, display in reversed(list(mapping.items()))}
+            for kind, mapping in forward.items()
+        },
+        # Distinct alerts in the log, and the latest ordinal of each requestID
+        "lines":      0,
+        "keys":       set(),
+        "latest":     {},
+        "error":      None,
+    }
+
+
+# ================= ENCODING =================
+def _encode_value(value):
+    if isinstance(value, pd.Timestamp):
+        return value.isoformat()
+    if isinstance(value, np.generic):
+        return value.item()
+    return str(value)
+
+
+def _encode(journal, row, op):
+    row = dict(row)
+    for col, kind in NAME_COLUMNS.items():
+        if col in row:
+            row[col] = journal["backward"][kind].get(row[col], row[col])
+    row[OP_FIELD] = op
+    return json.dumps(row, default=_encode_value)
+
+
+def _read_records(path):
+    # Parsed lines in log order, with their line numbers; a torn final line
+    # from a crash mid-append is skipped
+    records = []
+    with open(path, encoding="utf-8") as f:
+        for n, line in enumerate(f):
+            if not line.strip():
+                continue
+            try:
+                records.append((n, json.loads(line)))
+            except ValueError:
+                continue
+    return records
+
+
+def _alert_keys(records, known=(), latest=None):
+    # The alert each line is a version of, as (requestID, ordinal). Ordinal 0
+    # is a row already in the export (an ID in known); every create, and the
+    # first line of an ID seen nowhere else, starts the next ordinal. A
+    # latest dict carried between calls continues the numbering.
+    latest = {} if latest is None else latest
+    keys = []
+    for n, record in records:
+        request_id = record.get("requestID")
+        if request_id is None:
+            keys.append(("line", n))
+            continue
+        if record.get(OP_FIELD) == "create" or (request_id not in latest and request_id not in known):
+            latest[request_id] = latest.get(request_id, 0) + 1
+        keys.append((request_id, latest.get(request_id, 0)))
+    return keys
+
+
+def _decode_frame(journal, store, rows):
+    # All replayed rows are decoded at once: names mapped per column and
+    # timestamps parsed per column, then split back into row dicts carrying
+    # only the fields each line had
+    frame = pd.DataFrame(rows)
+    base  = store["base"]
+    for col in frame.columns:
+        if col in NAME_COLUMNS:
+            mapping = journal["forward"][NAME_COLUMNS[col]]
+            frame[col] = frame[col].map(lambda v: mapping.get(v, v))
+        elif col in base.columns and base[col].dtype.kind == "M":
+            frame[col] = pd.to_datetime(frame[col], errors="coerce")
+    decoded = frame.to_dict("records")
+    return [{col: values[col] for col in row} for row, values in zip(rows, decoded)]
+
+
+# ================= REPLAY AND RECORD =================
+def replay(journal, store):
+    # Run before record() is subscribed, so replayed rows are not logged again.
+    # Only the last version of each alert is applied, as one store delta.
+    alert_store.share_id_counter(store, journal["id_counter"])
+    if not os.path.exists(journal["path"]):
+        return 0
+    with journal["lock"]:
+        records = _read_records(journal["path"])
+
+    last = {}
+    for key, (_, record) in zip(_alert_keys(records, store["index"], journal["latest"]), records):
+        record.pop(OP_FIELD, None)
+        last[key] = record
+
+    keys = list(last)
+    rows = _decode_frame(journal, store, list(last.values())) if keys else []
+    alert_store.apply_changes(
+        store,
+        created=[row for key, row in zip(keys, rows) if key[1] != 0],
+        updated=[row for key, row in zip(keys, rows) if key[1] == 0],
+    )
+
+    journal["lines"] = len(records)
+    journal["keys"]  = set(keys)
+    return len(records)
+
+
+def record(journal, removed, added):
+    # Store listener: an added row is an update when the same change removed
+    # a row with its requestID, otherwise a new alert
+    if not added:
+        return
+    updated_ids = {row.get("requestID") for row in removed}
+    ops  = ["update" if row.get("requestID") in updated_ids else "create" for row in added]
+    text = "".join(_encode(journal, row, op) + "\n" for row, op in zip(added, ops))
+
+    # The store has already changed; a journal that cannot be written (e.g. a
+    # read-only cache directory) leaves the edit in this session only and is
+    # reported through last_error()
+    try:
+        with journal["lock"]:
+            os.makedirs(os.path.dirname(journal["path"]), exist_ok=True)
+            with open(journal["path"], "a", encoding="utf-8") as f:
+                f.write(text)
+                f.flush()
+                os.fsync(f.fileno())
+    except OSError as exc:
+        journal["error"] = str(exc)
+        return
+    # An updated ID is always a live alert, from the export if not the log
+    lines = [
+        (journal["lines"] + i, {"requestID": row.get("requestID"), OP_FIELD: op})
+        for i, (row, op) in enumerate(zip(added, ops))
+    ]
+    journal["error"]  = None
+    journal["lines"] += len(added)
+    journal["keys"].update(_alert_keys(lines, updated_ids, journal["latest"]))
+    _maybe_compact(journal)
+
+
+def last_error(journal):
+    # Why the latest edit could not be saved, or None once saving works
+    return journal["error"]
+
+
+# ================= COMPACTION =================
+def _maybe_compact(journal):
+    # A rewrite keeps one line per distinct alert, so it only starts once
+    # that shrinks the log by COMPACT_RATIO
+    lines, alerts = journal["lines"], len(journal["keys"])
+    if lines > COMPACT_MIN_LINES and lines > COMPACT_RATIO * alerts:
+        journal["lines"] = alerts
+        threading.Thread(
+            target=compact, args=(journal["path"],), daemon=True, name="alert-journal"
+        ).start()
+
+
+def compact(path):
+    # Keeps the last line per alert, in the order those lines were written.
+    # A kept line of an alert that began with a create is marked as a create,
+    # so replay never folds it into another alert with the same requestID.
+    lock = _shared_state(path)["lock"]
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with lock:
+        if not os.path.exists(path):
+            return
+        records = _read_records(path)
+        first_op, latest = {}, {}
+        for key, (n, record) in zip(_alert_keys(records), records):
+            first_op.setdefault(key, record.get(OP_FIELD))
+            latest[key] = (n, record)
+        for key, (_, record) in latest.items():
+            if first_op[key] == "create":
+                record[OP_FIELD] = "create"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                for _, record in sorted(latest.values(), key=lambda item: item[0]):
+                    f.write(json.dumps(record) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
@@ -0,0 +1,271 @@
+import threading
+from bisect import insort
+
+import numpy as np
+import pandas as pd
+
+import schema
+
+# ================= ALERT STORE =================
+# The loaded export is kept as an immutable base segment sorted by
+# deviationTime; apart from the relabelled name columns it shares its data
+# with the process-wide dataset cache, so several sessions on one export
+# hold one copy and only their own edits. Created alerts are appended to a
+# growth buffer (the tail).
+# An update tombstones the current copy of the row and appends the new
+# version, so the base never moves and the tail stays in time order.
+# Every change is pushed to listeners as (removed_rows, added_rows) so the
+# derived aggregates and lookup maps are updated instead of rebuilt.
+#
+# requestIDs are hashed to their current location, so finding the row behind
+# an ID is O(1) and the sorted ID list only changes when a new ID arrives.
+# New IDs are drawn from a counter that sessions on the same dataset share,
+# so two sessions never hand out the same ID.
+#
+# When the tail outgrows a fraction of the base it is folded back in with a
+# single sort, which keeps appends O(1) amortized. The folded base is a new
+# frame owned by the session, so from then on the session holds a private
+# copy of the dataset instead of sharing the cached one. That only happens
+# after max(COMPACT_MIN_ROWS, n / COMPACT_RATIO) edits in one session.
+COMPACT_MIN_ROWS = 4096
+COMPACT_RATIO    = 8
+
+
+def _max_request_id(values):
+    ids = pd.to_numeric(pd.Series(values), errors="coerce").dropna()
+    return int(ids.max()) if not ids.empty else 0
+
+
+def _index_base(df):
+    # The first row carrying an ID wins, as with a boolean-mask lookup
+    index = {}
+    for pos, request_id in enumerate(df["requestID"].tolist()):
+        if not pd.isna(request_id) and request_id not in index:
+            index[request_id] = ("base", pos)
+    return index
+
+
+def new_id_counter(last=0):
+    return {"lock": threading.Lock(), "last": last}
+
+
+def new_store(df):
+    df = schema.sort_by_time(df, reset_index=True)
+    index = _index_base(df)
+    return {
+        "base":       df,
+        "alive":      np.ones(len(df), dtype=bool),
+        "tail":       [],
+        "tail_alive": [],
+        "index":      index,
+        "ids":        schema.sorted_labels(index),
+        "max_id":     _max_request_id(df["requestID"]),
+        "id_counter": new_id_counter(),
+        "generation": 0,
+        "version":    0,
+        "memo":       {},
+        "listeners":  [],
+    }
+
+
+def subscribe(store, callback):
+    store["listeners"].append(callback)
+
+
+def share_id_counter(store, counter):
+    store["id_counter"] = counter
+
+
+def _memo(store, name, build):
+    # Small derived values are cached until the next change
+    if name not in store["memo"]:
+        store["memo"][name] = build()
+    return store["memo"][name]
+
+
+def _changed(store, removed, added):
+    store["version"] += 1
+    store["memo"] = {}
+    for callback in store["listeners"]:
+        callback(removed, added)
+    _maybe_compact(store)
+
+
+# ================= READS =================
+def next_request_id(store):
+    # Reserves the ID, so ask only when an alert is about to be created
+    counter = store["id_counter"]
+    with counter["lock"]:
+        counter["last"] = max(counter["last"], store["max_id"]) + 1
+        return counter["last"]
+
+
+def request_ids(store):
+    # Sorted; shared with the caller and must not be modified
+    return store["ids"]
+
+
+def _find(store, request_id):
+    return store["index"].get(request_id)
+
+
+def _row(store, location):
+    segment, pos = location
+    if segment == "tail":
+        return dict(store["tail"][pos])
+    return store["base"].iloc[pos].to_dict()
+
+
+def get_row(store, request_id):
+    location = _find(store, request_id)
+    return _row(store, location) if location is not None else None
+
+
+def tail_frame(store):
+    # Alive tail rows with the base dtypes; index labels continue after the
+    # base so frames built from both segments keep unique labels
+    def build():
+        positions = [i for i, alive in enumerate(store["tail_alive"]) if alive]
+        frame = pd.DataFrame(
+            [store["tail"][i] for i in positions],
+            columns=store["base"].columns,
+            index=pd.Index(len(store["base"]) + np.array(positions, dtype=np.int64))
+        )
+        return schema.align_dtypes(frame, store["base"])
+    return _memo(store, "tail_frame", build)
+
+
+def to_frame(store):
+    return _memo(store, "frame", lambda: schema.concat_frames(
+        [store["base"][store["alive"]], tail_frame(store)], ignore_index=True
+    ))
+
+
+def labels(store, col):
+    def build():
+        values = set(schema.category_labels(store["base"][col]))
+        values |= {r.get(col) for r, a in zip(store["tail"], store["tail_alive"]) if a}
+        return schema.sorted_labels(v for v in values if not pd.isna(v) and v != "")
+    return _memo(store, f"labels:{col}", build)
+
+
+def time_range(store):
+    def build():
+        times = store["base"]["deviationTime"].to_numpy()[store["alive"]]
+        times = np.concatenate([times, tail_frame(store)["deviationTime"].to_numpy()])
+        times = times[~np.isnat(times)]
+        if len(times) == 0:
+            return None, None
+        return pd.Timestamp(times.min()), pd.Timestamp(times.max())
+    return _memo(store, "time_range", build)
+
+
+# ================= WRITES =================
+def _track_id(store, request_id):
+    if pd.isna(request_id) or request_id in store["index"]:
+        return
+    if not store["ids"] or request_id > store["ids"][-1]:
+        store["ids"].append(request_id)
+    else:
+        insort(store["ids"], request_id)
+
+
+def _append(store, row):
+    row = dict(row)
+    request_id = row.get("requestID")
+    _track_id(store, request_id)
+
+    store["tail"].append(row)
+    store["tail_alive"].append(True)
+    if not pd.isna(request_id) and request_id not in store["index"]:
+        store["index"][request_id] = ("tail", len(store["tail"]) - 1)
+
+    numeric_id = pd.to_numeric(request_id, errors="coerce")
+    if not pd.isna(numeric_id):
+        store["max_id"] = max(store["max_id"], int(numeric_id))
+    return row
+
+
+def _replace(store, request_id, values, base_rows=None):
+    # base_rows holds base versions already gathered for a batch
+    location = _find(store, request_id)
+    if location is None:
+        return None, None
+
+    segment, pos = location
+    if segment == "base" and base_rows and request_id in base_rows:
+        old_row = base_rows.pop(request_id)
+    else:
+        old_row = _row(store, location)
+    new_row = {**old_row, **values}
+
+    if segment == "tail":
+        store["tail_alive"][pos] = False
+    else:
+        store["alive"][pos] = False
+
+    store["tail"].append(new_row)
+    store["tail_alive"].append(True)
+    store["index"][request_id] = ("tail", len(store["tail"]) - 1)
+    return old_row, new_row
+
+
+def append_row(store, row):
+    row = _append(store, row)
+    _changed(store, [], [row])
+    return row
+
+
+def update_row(store, request_id, values):
+    # All changed fields land in one new row version, so an edit is a single
+    # index lookup, one append and one delta however many fields it touches
+    old_row, new_row = _replace(store, request_id, values)
+    if old_row is None:
+        return None
+    _changed(store, [old_row], [new_row])
+    return new_row
+
+
+def apply_changes(store, created=(), updated=()):
+    # A batch of new alerts and new versions of existing ones, pushed to the
+    # listeners as a single delta. Created rows are always appended, even
+    # when their requestID is already taken; updates of unknown IDs are
+    # skipped.
+    removed, added = [], []
+    for row in created:
+        added.append(_append(store, row))
+
+    # Base versions of the updated alerts are gathered in one take
+    in_base = {}
+    for row in updated:
+        location = _find(store, row.get("requestID"))
+        if location is not None and location[0] == "base":
+            in_base[row.get("requestID")] = location[1]
+    base_rows = dict(zip(in_base, store["base"].iloc[list(in_base.values())].to_dict("records")))
+
+    for row in updated:
+        old_row, new_row = _replace(store, row.get("requestID"), row, base_rows)
+        if old_row is not None:
+            removed.append(old_row)
+            added.append(new_row)
+    if added:
+        _changed(store, removed, added)
+    return len(added)
+
+
+# ================= COMPACTION =================
+def _maybe_compact(store):
+    if len(store["tail"]) > max(COMPACT_MIN_ROWS, len(store["base"]) // COMPACT_RATIO):
+        compact(store)
+
+
+def compact(store):
+    # Replaces the shared base with a private, re-sorted copy (see above)
+    store["base"]       = schema.sort_by_time(to_frame(store), reset_index=True)
+    store["alive"]      = np.ones(len(store["base"]), dtype=bool)
+    store["tail"]       = []
+    store["tail_alive"] = []
+    store["index"]      = _index_base(store["base"])
+    store["generation"] += 1
+    store["version"]    += 1
+    store["memo"]       = {}
@@ -0,0 +1,259 @@
+import numpy as np
+import pandas as pd
+
+import aggregates
+import alert_journal
+import alert_store
+import lru
+import profiling
+import query_engine
+import schema
+import status_classes
+import tag_catalog
+import tag_categories
+import time_buckets
+
+# ================= ANALYTICS CORE =================
+# Everything the dashboard computes, without Streamlit: loading a dataset
+# into a store, the sidebar options, and the data behind each tab for a
+# filter. The tab modules only lay these results out, so this module can be
+# imported, timed and memoized on its own.
+
+
+# ================= RESULT CACHE =================
+# Tab data is memoized per session under (store state, filter tuple, result
+# id), like the figure specs, so a tab only recomputes when it is shown for
+# a state it has not seen yet. Only small results are cached (metrics,
+# counts, row positions); row frames are gathered again from the current
+# filtered view, so cached entries never keep old views alive.
+MAX_CACHED_RESULTS = 32
+
+
+def new_cache():
+    return lru.new_cache()
+
+
+def cached(cache, key, compute):
+    return lru.cached(cache, key, compute, MAX_CACHED_RESULTS)
+
+
+# ================= SESSION DATA =================
+def load_dataset(df_raw, dataset_key, system_mapping, assignee_mapping, engine_name=None):
+    # Mappings only replace the three name columns; every other column stays
+    # shared with the cached dataset, which is never written
+    with profiling.span("remap_names"):
+        df_mapped = schema.with_columns(
+            df_raw,
+            systemName=schema.remap_categorical(df_raw["systemName"], system_mapping),
+            currentAssignee=schema.remap_categorical(df_raw["currentAssignee"], assignee_mapping),
+            lastActionTakenBy=schema.remap_categorical(df_raw["lastActionTakenBy"], assignee_mapping)
+        )
+    with profiling.span("build_store"):
+        store = alert_store.new_store(df_mapped)
+
+    # The store pushes every create/update into the engine and the catalog
+    with profiling.span("open_engine"):
+        engine = query_engine.open_engine(
+            store, dataset_key, df_raw,
+            {"systemName": system_mapping, "currentAssignee": assignee_mapping},
+            name=engine_name
+        )
+    with profiling.span("build_catalog"):
+        catalog = tag_catalog.build_catalog(store["base"])
+    alert_store.subscribe(
+        store, lambda removed, added: tag_catalog.apply_delta(catalog, removed, added)
+    )
+
+    # Alerts created/updated in earlier runs are replayed through the store,
+    # then every new edit is appended to the journal
+    with profiling.span("replay_journal"):
+        journal = alert_journal.open_journal(dataset_key, system_mapping, assignee_mapping)
+        alert_journal.replay(journal, store)
+    alert_store.subscribe(
+        store, lambda removed, added: alert_journal.record(journal, removed, added)
+    )
+
+    return {"store": store, "engine": engine, "catalog": catalog, "journal": journal}
+
+
+def dashboard_options(store, people_roles):
+    people = (
+        set(alert_store.labels(store, "currentAssignee")) |
+        set(alert_store.labels(store, "lastActionTakenBy")) |
+        set(people_roles)
+    )
+    min_date, max_date = alert_store.time_range(store)
+    return {
+        "people":          sorted(people),
+        "systems":         alert_store.labels(store, "systemName"),
+        "active_statuses": [
+            s for s in alert_store.labels(store, "status")
+            if not status_classes.label_bits(s) & status_classes.BITS["closed"]
+        ],
+        "min_date":        min_date,
+        "max_date":        max_date,
+    }
+
+
+# ================= OVERVIEW =================
+def overview(period_counts, all_systems, all_active_statuses, system):
+    active = aggregates.only_active(period_counts)
+    result = {}
+
+    if system == "All":
+        # Active counts as a systems x statuses matrix, zero-filled
+        full_index = pd.MultiIndex.from_product(
+            [all_systems, all_active_statuses], names=["systemName", "status"]
+        )
+        result["active_by_system"] = (
+            aggregates.sum_by(active, ["systemName", "status"])
+            .reindex(full_index, fill_value=0)
+            .to_numpy()
+            .reshape(len(all_systems), len(all_active_statuses))
+        )
+
+        status_by_system = (
+            aggregates.sum_by(period_counts, ["systemName", "status"])
+            .reset_index(name="Count")
+        )
+        pivot_table = status_by_system.pivot_table(
+            index="systemName",
+            columns="status",
+            values="Count",
+            aggfunc="sum",
+            fill_value=0,
+            observed=True
+        )
+        pivot_table.index = pivot_table.index.astype(str)
+        pivot_table.index.name = "System"
+        pivot_table.columns = pivot_table.columns.astype(str)
+        pivot_table.columns.name = None
+        result["status_by_system"] = pivot_table
+    else:
+        result["active_by_status"] = (
+            aggregates.sum_by(active, "status")
+            .reindex(all_active_statuses, fill_value=0)
+            .to_numpy()
+        )
+
+    overall_stats = aggregates.sum_by(period_counts, "status").sort_values(ascending=False)
+    overall_stats = overall_stats[overall_stats > 0].reset_index()
+    overall_stats.columns = ["Status", "Count"]
+    result["overall_stats"] = overall_stats
+    return result
+
+
+# ================= ALERT STATISTICS =================
+def months(period_counts):
+    # Month buckets present and their labels; only the labels are formatted
+    codes = aggregates.month_buckets(period_counts)
+    return codes, [time_buckets.month_label(c) for c in codes]
+
+
+def month_bounds(df_filtered, month_code=None):
+    # Row positions [lo, hi) of the month; the filtered frame is in
+    # deviationTime order, so a month is a slice
+    if month_code is None:
+        return 0, len(df_filtered)
+
+    first_day, last_day = time_buckets.month_days(month_code)
+    times = df_filtered["deviationTime"].to_numpy()
+    lo    = times.searchsorted(first_day.to_datetime64(), side="left")
+    hi    = times.searchsorted((last_day + pd.Timedelta(days=1)).to_datetime64(), side="left")
+    return int(lo), int(hi)
+
+
+def month_counts(period_counts, month_code=None):
+    if month_code is None:
+        return period_counts
+    return aggregates.slice_days(period_counts, *time_buckets.month_days(month_code))
+
+
+def statistics(df_month, month_counts):
+    class_counts    = aggregates.status_class_counts(month_counts)
+    total_generated = aggregates.total(month_counts)
+    total_active    = total_generated - class_counts["closed"]
+    return {
+        "total_generated": total_generated,
+        "total_active":    total_active,
+        "total_closed":    class_counts["closed"],
+        "pending":         class_counts["pending"],
+        "implemented":     class_counts["implemented"],
+        "rejected":        class_counts["rejected"],
+        "wip":             class_counts["progress"],
+        "overdue":         class_counts["overdue"],
+        "auto_closed":     class_counts["auto_closed"],
+        "overdue_3":       status_classes.count_older_than(
+            df_month["status"], df_month["deviationTime"], "overdue", days=3
+        ),
+        "target_revision": total_active,
+    }
+
+
+def active_by_role(month_counts, people_roles):
+    return (
+        aggregates.sum_by_role(aggregates.only_active(month_counts), people_roles)
+        .sort_values(ascending=False)
+    )
+
+
+# ================= ALERT MANAGEMENT =================
+MANAGEMENT_SEARCH_COLUMNS = ["odsCauseTagName", "systemName", "status", "causeMessage"]
+MANAGEMENT_SORT_COLUMNS = {
+    "Deviation Time": "deviationTime",
+    "Alert ID":       "requestID",
+    "Category":       "odsCauseTagName",
+    "Deviation":      "status",
+}
+
+
+def management_positions(df_filtered, category="All", deviation="All"):
+    # Tags and statuses are matched once per distinct label, then rows are
+    # selected by their category codes
+    mask = np.ones(len(df_filtered), dtype=bool)
+    if category != "All":
+        mask &= np.asarray(tag_categories.in_category(df_filtered["odsCauseTagName"], category))
+    if deviation == "Pending":
+        mask &= np.asarray(status_classes.has_class(df_filtered["status"], "pending"))
+    return np.flatnonzero(mask)
+
+
+def management_display(rows):
+    # Meant for one page of rows at a time
+    return pd.DataFrame({
+        "Alert ID":      rows["requestID"],
+        "Category":      rows["odsCauseTagName"],
+        "Cause (System)":rows["causeMessage"].fillna("") + " | " + rows["systemName"].astype(object).fillna(""),
+        "KPI":           rows["odsCauseTagName"],
+        "Deviation":     rows["status"],
+        "Due Date":      "",
+        "Comments":      rows["comments"].fillna("")
+    })
+
+
+# ================= ALERT CONFIGURATION =================
+def config_lookups(store):
+    return {
+        "stage_ids": alert_store.labels(store, "stageID"),
+        "assignees": alert_store.labels(store, "currentAssignee"),
+        "statuses":  alert_store.labels(store, "status"),
+        "alert_ids": alert_store.request_ids(store),
+    }
+
+
+def tag_defaults(catalog, system, tag):
+    return {
+        "cause":           tag_catalog.lookup(catalog, "causeMessage",  tag),
+        "suggestion":      tag_catalog.lookup(catalog, "suggestion",    tag),
+        "uom":             tag_catalog.lookup(catalog, "causeUom",      tag),
+        "tag_id":          tag_catalog.lookup(catalog, "odsCauseTagID", tag),
+        "last_occurrence": tag_catalog.last_occurrence(catalog, system, tag),
+    }
+
+
+def cause_gap(actual, optimum):
+    # Empty when either value is not a number
+    try:
+        return abs(float(actual) - float(optimum))
+    except (TypeError, ValueError):
+        return ""
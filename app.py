@@ -1,8 +1,18 @@
 import streamlit as st
-import pandas as pd
-from io import BytesIO
 import random
 
+import alert_journal
+import alert_store
+import analytics
+import data_loader
+import export
+import figures
+import filters
+import paged_table
+import profile_panel
+import profiling
+import query_engine
+import schema
 import tab_overview
 import tab_alert_statistics
 import tab_alert_management
@@ -12,6 +22,9 @@ import tab_alert_config
 st.set_page_config(layout="wide")
 st.title("Alert Dashboard")
 
+# Stage timings for this rerun, when switched on under Debug in the sidebar
+profiling.start_run(st.session_state, enabled=st.session_state.get("profile_enabled", False))
+
 # ================= RANDOM NAME POOLS =================
 RANDOM_SYSTEM_NAMES = [
     "Alpha_System", "Beta_Unit", "Gamma_Section", "Delta_Module",
@@ -27,6 +40,22 @@ RANDOM_USER_NAMES = [
     "Elena Rossi", "Omar Farouq", "Sofia Andrade", "Ravi Nair"
 ]
 
+# ================= TAB LAYOUT =================
+TAB_NAMES = [
+    "Overview", "Alert Statistics", "Alert Management",
+    "Admin Controlled", "Alert Configuration"
+]
+
+# Widget state of the tabs that is kept while another tab is shown
+TAB_STATE_KEYS = [
+    "month_select", "category_select", "deviation_select", "admin_person_select",
+    "upd_alert_id", "upd_status", "upd_due_date", "upd_stage", "upd_assignee", "upd_comments",
+    "new_system", "new_tag", "new_cause_actual", "new_cause_optimum",
+    "new_due_date", "new_stage", "new_assignee", "new_comments",
+    "new_member_name", "new_member_role", "update_member_role",
+] + paged_table.state_keys("mgmt_table") + paged_table.state_keys("registry_table")
+
+# ================= DEFAULT ROLES =================
 DEFAULT_ROLES = [
     "Process Engineer",
     "Process Manager",
@@ -101,8 +130,8 @@ if "people_roles" not in st.session_state:
 if "roles_initialized" not in st.session_state:
     st.session_state["roles_initialized"] = False
 
-if "df_master" not in st.session_state:
-    st.session_state["df_master"] = None
+if "alert_store" not in st.session_state:
+    st.session_state["alert_store"] = None
 
 if "system_mapping" not in st.session_state:
     st.session_state["system_mapping"] = {}
@@ -119,32 +148,71 @@ if "show_mapping_ui" not in st.session_state:
 if "last_uploaded_file" not in st.session_state:
     st.session_state["last_uploaded_file"] = None
 
+if "dataset_lease" not in st.session_state:
+    st.session_state["dataset_lease"] = None
+
+if "view_cache" not in st.session_state:
+    st.session_state["view_cache"] = filters.new_cache()
+
+if "query_engine" not in st.session_state:
+    st.session_state["query_engine"] = None
+
+if "tag_catalog" not in st.session_state:
+    st.session_state["tag_catalog"] = None
+
+if "alert_journal" not in st.session_state:
+    st.session_state["alert_journal"] = None
+
+if "export_cache" not in st.session_state:
+    st.session_state["export_cache"] = export.new_cache()
+
+if "figure_cache" not in st.session_state:
+    st.session_state["figure_cache"] = figures.new_cache()
+
+if "result_cache" not in st.session_state:
+    st.session_state["result_cache"] = analytics.new_cache()
+
+if "last_profile" not in st.session_state:
+    st.session_state["last_profile"] = None
+
 # ================= FILE UPLOAD =================
-uploaded_file = st.file_uploader("Upload Excel File", type=["xlsx"], key="excel_uploader")
+uploaded_file = st.file_uploader(
+    "Upload Alert Export (Excel, CSV or Parquet)",
+    type=data_loader.SUPPORTED_TYPES,
+    key="excel_uploader"
+)
 
 if uploaded_file is not None:
 
+    # ================= READ FILE =================
+    # Parsed once per file content; the cached frame is shared by every
+    # session on the same file and is read-only
+    with profiling.span("load_export"):
+        dataset_key, df_raw = data_loader.load_alert_export(uploaded_file)
+
     # ================= DETECT NEW FILE UPLOAD =================
     # If a new file is uploaded reset mapping state so options appear fresh
-    if st.session_state["last_uploaded_file"] != uploaded_file.name:
-        st.session_state["last_uploaded_file"] = uploaded_file.name
+    if st.session_state["last_uploaded_file"] != dataset_key:
+        st.session_state["last_uploaded_file"] = dataset_key
+        st.session_state["dataset_lease"]      = data_loader.DatasetLease(dataset_key)
         st.session_state["mapping_confirmed"]  = False
         st.session_state["show_mapping_ui"]    = False
         st.session_state["system_mapping"]     = {}
         st.session_state["assignee_mapping"]   = {}
         st.session_state["people_roles"]       = {}
-        st.session_state["df_master"]          = None
+        st.session_state["alert_store"]        = None
         st.session_state["roles_initialized"]  = False
-
-    # ================= READ FILE =================
-    df_raw = pd.read_excel(uploaded_file, header=None)
-    df_raw = df_raw.iloc[1:].reset_index(drop=True)
-    df_raw.columns = df_raw.iloc[0]
-    df_raw = df_raw.iloc[1:].reset_index(drop=True)
-    df_raw.columns = df_raw.columns.astype(str).str.strip()
-
-    raw_systems   = sorted(df_raw["systemName"].dropna().unique().tolist())
-    raw_assignees = sorted(df_raw["currentAssignee"].dropna().unique().tolist())
+        st.session_state["view_cache"]         = filters.new_cache()
+        st.session_state["query_engine"]       = None
+        st.session_state["tag_catalog"]        = None
+        st.session_state["alert_journal"]      = None
+        st.session_state["export_cache"]       = export.new_cache()
+        st.session_state["figure_cache"]       = figures.new_cache()
+        st.session_state["result_cache"]       = analytics.new_cache()
+
+    # Read from the category lists, not the rows
+    raw_systems   = schema.category_labels(df_raw["systemName"])
+    raw_assignees = schema.category_labels(df_raw["currentAssignee"])
 
     # ================= GENERATE MAPPINGS IF NOT SET =================
     if not st.session_state["system_mapping"]:
@@ -253,25 +321,30 @@ if uploaded_file is not None:
 
         st.stop()
 
-    # ================= APPLY SYSTEM MAPPING =================
-    df_raw["systemName"] = df_raw["systemName"].replace(
-        st.session_state["system_mapping"]
-    )
-
-    # ================= APPLY ASSIGNEE MAPPING =================
-    df_raw["currentAssignee"]   = df_raw["currentAssignee"].replace(
-        st.session_state["assignee_mapping"]
-    )
-    df_raw["lastActionTakenBy"] = df_raw["lastActionTakenBy"].replace(
-        st.session_state["assignee_mapping"]
-    )
-
-    # ================= DATETIME CONVERSION =================
-    df_raw["deviationTime"] = pd.to_datetime(df_raw["deviationTime"], errors="coerce")
-
-    # ================= LOAD INTO MASTER ONCE =================
-    if st.session_state["df_master"] is None:
-        st.session_state["df_master"] = df_raw.copy()
+    # ================= LOAD INTO STORE ONCE =================
+    # Store, query engine and tag catalog are built once and kept current by
+    # create/update deltas; saved edits are replayed from the journal
+    if st.session_state["alert_store"] is None:
+        with profiling.span("load_dataset"):
+            loaded = analytics.load_dataset(
+                df_raw, dataset_key,
+                st.session_state["system_mapping"],
+                st.session_state["assignee_mapping"]
+            )
+        st.session_state["alert_store"]   = loaded["store"]
+        st.session_state["query_engine"]  = loaded["engine"]
+        st.session_state["tag_catalog"]   = loaded["catalog"]
+        st.session_state["alert_journal"] = loaded["journal"]
+
+    store = st.session_state["alert_store"]
+
+    # Edits stay in the session when they cannot be written to disk
+    journal_error = alert_journal.last_error(st.session_state["alert_journal"])
+    if journal_error:
+        st.warning(
+            f"The last alert change could not be saved to disk ({journal_error}). "
+            "It is kept for this session only."
+        )
 
     # ================= INIT ROLES ONCE =================
     if not st.session_state["roles_initialized"]:
@@ -279,33 +352,24 @@ if uploaded_file is not None:
         st.session_state["people_roles"]      = generate_roles_mapping(mapped_names)
         st.session_state["roles_initialized"] = True
 
-    # ================= WORK FROM MASTER =================
-    df = st.session_state["df_master"].copy()
+    # ================= WORK FROM STORE =================
+    # The Role column and indexes are derived once per store generation and
+    # roles map; only the small tail of created/updated alerts follows edits
+    view_cache = st.session_state["view_cache"]
+    with profiling.span("refresh_view"):
+        filters.refresh(view_cache, store, st.session_state["people_roles"])
 
-    # ================= APPLY ROLE COLUMN =================
-    df["Role"] = df["currentAssignee"].map(
-        st.session_state["people_roles"]
-    ).fillna("Other")
-
-    # ================= REMOVE CLOSED =================
-    df_active = df[~df["status"].str.lower().str.contains("closed", na=False)]
-
-    # ================= EXISTING PEOPLE =================
-    existing_assignees   = set(df["currentAssignee"].dropna().unique().tolist())
-    existing_last_action = set(df["lastActionTakenBy"].dropna().unique().tolist())
-    all_existing_people  = sorted(
-        existing_assignees.union(existing_last_action) |
-        set(st.session_state["people_roles"].keys())
-    )
-
-    all_active_statuses = sorted(df_active["status"].dropna().unique().tolist())
-    all_systems         = sorted(df["systemName"].dropna().unique().tolist())
+    # ================= EXISTING PEOPLE, STATUSES AND SYSTEMS =================
+    with profiling.span("dashboard_options"):
+        options = analytics.dashboard_options(store, st.session_state["people_roles"])
+    all_existing_people = options["people"]
+    all_active_statuses = options["active_statuses"]
+    all_systems         = options["systems"]
 
     # ================= SIDEBAR =================
     st.sidebar.header("Filters")
 
-    min_date = df["deviationTime"].min()
-    max_date = df["deviationTime"].max()
+    min_date, max_date = options["min_date"], options["max_date"]
 
     period = st.sidebar.date_input(
         "Select Period",
@@ -317,7 +381,7 @@ if uploaded_file is not None:
 
     start_date, end_date = period
 
-    affiliates = sorted(df["systemName"].dropna().unique())
+    affiliates = all_systems
     affiliate_selected = st.sidebar.selectbox(
         "Select System",
         ["All"] + list(affiliates),
@@ -333,64 +397,118 @@ if uploaded_file is not None:
         st.session_state["system_mapping"]     = {}
         st.session_state["assignee_mapping"]   = {}
         st.session_state["people_roles"]       = {}
-        st.session_state["df_master"]          = None
+        st.session_state["alert_store"]        = None
         st.session_state["roles_initialized"]  = False
+        st.session_state["view_cache"]         = filters.new_cache()
+        st.session_state["query_engine"]       = None
+        st.session_state["tag_catalog"]        = None
+        st.session_state["alert_journal"]      = None
+        st.session_state["export_cache"]       = export.new_cache()
+        st.session_state["figure_cache"]       = figures.new_cache()
+        st.session_state["result_cache"]       = analytics.new_cache()
         st.session_state["last_uploaded_file"] = None
+        st.session_state["dataset_lease"]      = None
         st.rerun()
 
     # ================= SIDEBAR DOWNLOAD =================
     st.sidebar.markdown("---")
     st.sidebar.markdown("### Download")
 
-    def convert_df_to_excel(dataframe):
-        output = BytesIO()
-        with pd.ExcelWriter(output, engine="openpyxl") as writer:
-            dataframe.to_excel(writer, index=False, sheet_name="Updated Data")
-        return output.getvalue()
-
-    st.sidebar.download_button(
-        label="Download Updated Data (Excel)",
-        data=convert_df_to_excel(df),
-        file_name="updated_alert_data.xlsx",
-        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        key="download_excel"
+    # Files are built on request in the background and kept per store state,
+    # roles and format; reruns only check on the job
+    export_format = st.sidebar.selectbox(
+        "Format", export.format_names(), index=0, key="export_format"
+    )
+    export_key = (
+        store["generation"], store["version"],
+        filters.roles_key(st.session_state["people_roles"]), export_format
     )
+    export_cache = st.session_state["export_cache"]
+    export_job   = export.job(export_cache, export_key)
+
+    if export_job is None:
+        if st.sidebar.button("Prepare Download", key="prepare_export_btn"):
+            with profiling.span("export_submit"):
+                export.submit(
+                    export_cache, export_key,
+                    filters.with_role(alert_store.to_frame(store), st.session_state["people_roles"]),
+                    export_format
+                )
+            st.rerun()
+    elif not export_job.done():
+        st.sidebar.info("Preparing export...")
+        st.sidebar.button("Refresh", key="refresh_export_btn")
+    elif export_job.exception() is not None:
+        st.sidebar.error(f"Export failed: {export_job.exception()}")
+    else:
+        st.sidebar.download_button(
+            label=f"Download Updated Data ({export_format})",
+            data=export_job.result(),
+            file_name=export.file_name(export_format),
+            mime=export.mime_type(export_format),
+            key="download_excel"
+        )
 
     # ================= FILTER =================
-    df_filtered = df[
-        (df["deviationTime"] >= pd.to_datetime(start_date)) &
-        (df["deviationTime"] <= pd.to_datetime(end_date))
-    ]
-
-    df_active_filtered = df_active[
-        (df_active["deviationTime"] >= pd.to_datetime(start_date)) &
-        (df_active["deviationTime"] <= pd.to_datetime(end_date))
-    ]
-
-    if affiliate_selected != "All":
-        df_filtered        = df_filtered[df_filtered["systemName"] == affiliate_selected]
-        df_active_filtered = df_active_filtered[df_active_filtered["systemName"] == affiliate_selected]
+    # Tabs share one row selection per filter combination; charts and metrics
+    # are answered by the query engine. Both are only computed for the tabs
+    # that need them, and tab results are cached per store state and filter.
+    view_key = (
+        store["generation"], store["version"], start_date, end_date, affiliate_selected
+    )
 
-    # ================= TABS =================
-    tab1, tab2, tab3, tab4, tab5 = st.tabs([
-        "Overview", "Alert Statistics", "Alert Management",
-        "Admin Controlled", "Alert Configuration"
-    ])
-
-    with tab1:
-        tab_overview.render(
-            df_filtered, df_active_filtered,
-            all_systems, all_active_statuses, affiliate_selected
-        )
+    def filtered_rows():
+        with profiling.span("filtered_view"):
+            return filters.filtered_view(
+                view_cache, store, start_date, end_date, affiliate_selected
+            )
 
-    with tab2:
-        tab_alert_statistics.render(df_filtered)
+    def filtered_counts():
+        with profiling.span("period_counts"):
+            return query_engine.period_counts(
+                st.session_state["query_engine"], start_date, end_date, affiliate_selected
+            )
 
-    with tab3:
-        tab_alert_management.render(df_filtered)
+    # ================= DEBUG =================
+    # Shows the previous rerun's profile; this one is still being measured
+    profile_panel.render(st.session_state["last_profile"])
 
-    with tab4:
-        tab_admin.render(all_existing_people)
+    # ================= TABS =================
+    # Only the selected tab is rendered, so a rerun costs what that tab
+    # costs. Widgets of hidden tabs are not drawn, and Streamlit would drop
+    # their state; writing it back keeps selections across tab switches.
+    for state_key in TAB_STATE_KEYS:
+        if state_key in st.session_state:
+            st.session_state[state_key] = st.session_state[state_key]
+
+    active_tab = st.radio(
+        "View", TAB_NAMES, horizontal=True, label_visibility="collapsed", key="active_tab"
+    )
 
-    with tab5:
-        tab_alert_config.render(df, all_systems)
+    # Tabs may stop the script early, so the run is closed in a finally
+    try:
+        with profiling.span("tab_" + active_tab.lower().replace(" ", "_")):
+            if active_tab == "Overview":
+                tab_overview.render(
+                    filtered_counts(),
+                    all_systems, all_active_statuses, affiliate_selected, view_key
+                )
+
+            elif active_tab == "Alert Statistics":
+                tab_alert_statistics.render(
+                    filtered_rows(), filtered_counts(),
+                    st.session_state["people_roles"], view_key
+                )
+
+            elif active_tab == "Alert Management":
+                tab_alert_management.render(filtered_rows(), view_key)
+
+            elif active_tab == "Admin Controlled":
+                tab_admin.render(all_existing_people)
+
+            else:
+                tab_alert_config.render(store, st.session_state["tag_catalog"], all_systems)
+    finally:
+        profile = profiling.finish_run(st.session_state)
+        if profile is not None:
+            st.session_state["last_profile"] = profile
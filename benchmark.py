@@ -0,0 +1,265 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+import aggregates
+import alert_store
+import analytics
+import data_loader
+import export
+import filters
+import paged_table
+import query_engine
+import synthetic_export
+import tag_catalog
+import tag_categories
+
+# ================= BENCHMARKS =================
+# Times each stage of the dashboard's data path separately on synthetic
+# exports of several sizes and writes the results as JSON. A previous
+# results file can be passed as a baseline; stages slower than the baseline
+# by more than the tolerance are reported and fail the run. Results record
+# the run's options, and a baseline taken with other options is refused.
+#
+#   python benchmark.py --rows 10000 100000 1000000 --output bench.json
+#   python benchmark.py --rows 100000 --baseline bench.json
+DEFAULT_ROWS = [10_000, 100_000, 1_000_000]
+DEFAULT_REPEAT = 3
+DEFAULT_TOLERANCE = 1.25
+EDIT_BATCH = 100
+
+
+def _time(fn, repeat):
+    # Median of several runs, in seconds; the last result is returned too
+    timings = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings), result
+
+
+def _period(store):
+    first, last = alert_store.time_range(store)
+    return first.date(), last.date(), (first + (last - first) / 2).date()
+
+
+def run_size(rows, repeat, fmt, **generator_options):
+    results = {}
+    df_source = synthetic_export.generate_alerts(rows, **generator_options)
+    data = synthetic_export.WRITERS[fmt](df_source)
+
+    # Sidecars go to a scratch directory for the run
+    sidecar_dir_before = data_loader.SIDECAR_DIR
+    with tempfile.TemporaryDirectory() as sidecar_dir:
+        data_loader.SIDECAR_DIR = sidecar_dir
+        try:
+            _run_stages(results, data, fmt, repeat)
+        finally:
+            data_loader.SIDECAR_DIR = sidecar_dir_before
+    return results
+
+
+def _run_stages(results, data, fmt, repeat):
+    # ---- ingestion: parse from scratch, then reload from the sidecar ----
+    key = data_loader.content_hash(data)
+    results["ingest_parse"], df_raw = _time(
+        lambda: data_loader._ingest(f"{key}-{time.perf_counter_ns()}", data, f"x.{fmt}"), 1
+    )
+    data_loader.write_sidecar(key, df_raw)
+    results["ingest_sidecar"], _ = _time(lambda: data_loader._ingest(key, data, f"x.{fmt}"), repeat)
+
+    # ---- store, count cube and tag catalog ----
+    results["store_build"], store = _time(lambda: alert_store.new_store(df_raw), repeat)
+    results["cube_build"], _      = _time(lambda: aggregates.build_cube(store["base"]), repeat)
+    results["catalog_build"], catalog = _time(lambda: tag_catalog.build_catalog(store["base"]), repeat)
+    engine = query_engine.open_engine(store, key, df_raw, {}, name="pandas")
+
+    # ---- filtering ----
+    roles  = {p: "Process Engineer" for p in alert_store.labels(store, "currentAssignee")[::2]}
+    system = alert_store.labels(store, "systemName")[0]
+    start, end, mid = _period(store)
+
+    def filter_cold():
+        cache = filters.new_cache()
+        filters.refresh(cache, store, roles)
+        return filters.filtered_view(cache, store, start, mid, system)
+
+    results["filter_cold"], view = _time(filter_cold, repeat)
+
+    # Alternates between two periods on a warm cache, as a date edit does
+    cache = filters.new_cache()
+    filters.refresh(cache, store, roles)
+    specs = [(start, mid, system), (start, end, system)]
+
+    def filter_change():
+        specs.reverse()
+        return filters.filtered_view(cache, store, *specs[0])
+
+    results["filter_change"], _ = _time(filter_change, repeat)
+
+    # ---- tab data preparation, through the analytics core ----
+    counts  = query_engine.period_counts(engine, start, end)
+    options = analytics.dashboard_options(store, roles)
+
+    def overview_prep():
+        return analytics.overview(counts, options["systems"], options["active_statuses"], "All")
+
+    # The same calls, in the same order, as the tabs make on a cache miss
+    def statistics_prep():
+        codes, _     = analytics.months(counts)
+        month_code   = codes[len(codes) // 2]
+        month_counts = analytics.month_counts(counts, month_code)
+        lo, hi       = analytics.month_bounds(view, month_code)
+        return (
+            analytics.statistics(view.iloc[lo:hi], month_counts),
+            analytics.active_by_role(month_counts, roles),
+        )
+
+    def management_prep():
+        rows = view.iloc[analytics.management_positions(view, tag_categories.names()[0], "Pending")]
+        positions = np.flatnonzero(
+            paged_table.search_mask(rows, analytics.MANAGEMENT_SEARCH_COLUMNS, "TAG")
+        )
+        page = paged_table.sort_order(rows, positions, "status", True)[:paged_table.PAGE_SIZES[0]]
+        return analytics.management_display(rows.iloc[page])
+
+    def config_prep():
+        tags = tag_catalog.tags_for_system(catalog, system)
+        return (
+            analytics.config_lookups(store),
+            analytics.tag_defaults(catalog, system, tags[0] if tags else None),
+        )
+
+    results["period_counts"], _   = _time(lambda: query_engine.period_counts(engine, start, mid, system), repeat)
+    results["overview_prep"], _   = _time(overview_prep, repeat)
+    results["statistics_prep"], _ = _time(statistics_prep, repeat)
+    results["management_prep"], _ = _time(management_prep, repeat)
+    results["config_prep"], _     = _time(config_prep, repeat)
+
+    # ---- create / update, per edit ----
+    def creates():
+        for _ in range(EDIT_BATCH):
+            alert_store.append_row(store, {
+                "requestID":       alert_store.next_request_id(store),
+                "systemName":      system,
+                "status":          "Pending",
+                "currentAssignee": "Person 000",
+                "deviationTime":   pd.Timestamp.now(),
+            })
+
+    ids = alert_store.request_ids(store)
+
+    def updates():
+        for request_id in ids[:EDIT_BATCH]:
+            alert_store.update_row(store, request_id, {"status": "Closed"})
+
+    results["create_alert"] = _time(creates, 1)[0] / EDIT_BATCH
+    results["update_alert"] = _time(updates, 1)[0] / EDIT_BATCH
+
+    # ---- export ----
+    frame = filters.with_role(alert_store.to_frame(store), roles)
+    for name in export.format_names():
+        # Excel is the slow path; one run is enough at the larger sizes
+        results[f"export_{name.lower()}"], _ = _time(
+            lambda: export.WRITERS[name](frame), 1 if name == "Excel" else repeat
+        )
+
+
+# ================= BASELINES =================
+def environment():
+    return {
+        "python":   platform.python_version(),
+        "pandas":   pd.__version__,
+        "numpy":    np.__version__,
+        "platform": platform.platform(),
+    }
+
+
+def config_differences(results, baseline):
+    # Options that differ between two runs; their timings are not comparable
+    config, before = results["config"], baseline.get("config", {})
+    return {
+        name: (before.get(name), value)
+        for name, value in config.items() if before.get(name) != value
+    }
+
+
+def compare(results, baseline, tolerance):
+    regressions = []
+    for rows, stages in results["sizes"].items():
+        for stage, seconds in stages.items():
+            before = baseline.get("sizes", {}).get(rows, {}).get(stage)
+            if before and seconds > before * tolerance:
+                regressions.append((rows, stage, before, seconds))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time the alert dashboard's data path")
+    parser.add_argument("--rows",      type=int, nargs="+", default=DEFAULT_ROWS)
+    parser.add_argument("--repeat",    type=int, default=DEFAULT_REPEAT)
+    parser.add_argument("--format",    choices=list(synthetic_export.WRITERS), default="csv")
+    parser.add_argument("--systems",   type=int, default=12)
+    parser.add_argument("--tags",      type=int, default=200)
+    parser.add_argument("--assignees", type=int, default=40)
+    parser.add_argument("--output",    help="Write results as JSON to this file")
+    parser.add_argument("--baseline",  help="Compare against a previous results file")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    args = parser.parse_args()
+
+    # Everything besides --rows that changes what is timed
+    config = {
+        "format":    args.format,
+        "repeat":    args.repeat,
+        "systems":   args.systems,
+        "tags":      args.tags,
+        "assignees": args.assignees,
+    }
+    results = {"environment": environment(), "config": config, "sizes": {}}
+
+    # Checked before anything is timed
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        differences = config_differences(results, baseline)
+        if differences:
+            for name, (before, after) in differences.items():
+                print(f"Baseline was run with {name}={before}, this run with {name}={after}")
+            sys.exit("Not comparing runs with different options")
+
+    for rows in args.rows:
+        stages = run_size(
+            rows, args.repeat, args.format,
+            systems=args.systems, tags=args.tags, assignees=args.assignees
+        )
+        results["sizes"][str(rows)] = stages
+        print(f"{rows:>9} rows")
+        for stage, seconds in stages.items():
+            print(f"    {stage:<18} {seconds * 1000:>10.2f} ms")
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+    if baseline is not None:
+        regressions = compare(results, baseline, args.tolerance)
+        for rows, stage, before, after in regressions:
+            print(f"REGRESSION {rows} rows {stage}: {before * 1000:.2f} ms -> {after * 1000:.2f} ms")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
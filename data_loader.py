@@ -0,0 +1,250 @@
+import csv
+import hashlib
+import os
+import threading
+import weakref
+from collections import OrderedDict
+from io import BytesIO
+
+import pandas as pd
+
+import lru
+import profiling
+import schema
+
+try:
+    import pyarrow  # noqa: F401
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+SUPPORTED_TYPES = ["xlsx", "csv", "parquet"]
+HEADER_SCAN_BYTES = 64 * 1024
+
+# ================= PARQUET SIDECAR =================
+# The first load of an export is converted to a local Parquet file holding the
+# normalized header and typed columns; later loads memory-map that file.
+# Derived files carry FORMAT_VERSION in their names, so a change to how
+# exports are parsed or stored never picks up files written the old way.
+FORMAT_VERSION = 1
+
+SIDECAR_DIR = os.environ.get(
+    "ALERT_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".alert_cache")
+)
+
+# ================= DATASET CACHE =================
+# Parsed exports are kept process-wide, keyed by the sha256 of the upload, so
+# widget reruns and every session opening the same file share one typed,
+# deviationTime-ordered frame instead of parsing and holding their own.
+# Sessions hold a lease on the datasets they use; when the total size passes
+# the memory budget the least recently used datasets nobody leases are
+# dropped. The shared frames are read-only.
+MAX_CACHE_BYTES = int(os.environ.get("ALERT_CACHE_MAX_BYTES", 2 * 1024 ** 3))
+MAX_UPLOAD_IDS = 256
+
+_workbook_cache = OrderedDict()
+_cache_bytes = {}
+_lease_counts = {}
+_hash_by_file_id = lru.new_cache()
+_cache_lock = threading.Lock()
+
+
+def content_hash(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def upload_key(uploaded_file):
+    # Streamlit gives every upload a stable file_id, so the bytes are only
+    # hashed once per upload rather than once per rerun
+    file_id = getattr(uploaded_file, "file_id", None)
+    if file_id is not None:
+        with _cache_lock:
+            key = lru.get(_hash_by_file_id, file_id)
+        if key is not None:
+            return key
+
+    key = content_hash(uploaded_file.getvalue())
+
+    # Upload ids are only remembered for the most recent uploads
+    if file_id is not None:
+        with _cache_lock:
+            lru.put(_hash_by_file_id, file_id, key, MAX_UPLOAD_IDS)
+    return key
+
+
+# ================= FORMAT DETECTION =================
+def detect_format(data, file_name=""):
+    if data[:4] == b"PAR1":
+        return "parquet"
+    if data[:2] == b"PK":
+        return "xlsx"
+    ext = os.path.splitext(file_name or "")[1].lower().lstrip(".")
+    if ext in SUPPORTED_TYPES:
+        return ext
+    return "csv"
+
+
+def _header_row(first_rows):
+    # Exports carry a title row above the header; plain files do not
+    for i, row in enumerate(first_rows):
+        if "systemName" in [str(v).strip() for v in row]:
+            return i
+    return 1
+
+
+# ================= PARSERS =================
+def _unify_object_columns(df):
+    # Excel columns can mix ints, floats, strings and timestamps in one object
+    # column, which Arrow refuses; numeric mixes become floats, others strings.
+    # Done at parse time so the first load and sidecar loads see the same frame.
+    fixed = {}
+    for col in df.columns[df.dtypes == object]:
+        kinds = set(df[col].dropna().map(type))
+        if len(kinds) <= 1:
+            continue
+        if kinds <= {int, float, bool}:
+            fixed[col] = pd.to_numeric(df[col], errors="coerce")
+        else:
+            fixed[col] = df[col].where(df[col].isna(), df[col].astype(str))
+    return df.assign(**fixed) if fixed else df
+
+
+def _normalize(df):
+    df.columns = df.columns.astype(str).str.strip().rename(None)
+    df = _unify_object_columns(df.infer_objects())
+    df["deviationTime"] = pd.to_datetime(df["deviationTime"], errors="coerce")
+    return df
+
+
+def parse_alert_workbook(data):
+    df_raw = pd.read_excel(BytesIO(data), header=None)
+    header = _header_row(df_raw.iloc[:2].values.tolist())
+    df_raw.columns = df_raw.iloc[header]
+    df_raw = df_raw.iloc[header + 1:].reset_index(drop=True)
+    return _normalize(df_raw)
+
+
+def parse_alert_csv(data):
+    # The title row may or may not be padded with commas, so the first lines
+    # are read as text rows of any width rather than as a table
+    head = data[:HEADER_SCAN_BYTES].decode("utf-8", errors="replace").splitlines()[:2]
+    header = _header_row(list(csv.reader(head)))
+    return _normalize(pd.read_csv(BytesIO(data), skiprows=header))
+
+
+def parse_alert_parquet(source):
+    return _normalize(pd.read_parquet(source))
+
+
+PARSERS = {
+    "xlsx":    parse_alert_workbook,
+    "csv":     parse_alert_csv,
+    "parquet": lambda data: parse_alert_parquet(BytesIO(data)),
+}
+
+
+# ================= SIDECAR IO =================
+def sidecar_path(key):
+    return os.path.join(SIDECAR_DIR, f"{key}.v{FORMAT_VERSION}.parquet")
+
+
+def write_sidecar(key, df):
+    if not HAS_PYARROW:
+        return None
+    path = sidecar_path(key)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(SIDECAR_DIR, exist_ok=True)
+        df.to_parquet(tmp_path, engine="pyarrow", index=False)
+        os.replace(tmp_path, path)
+    except (OSError, ValueError, TypeError):
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return None
+    return path
+
+
+def read_sidecar(key):
+    path = sidecar_path(key)
+    if not HAS_PYARROW or not os.path.exists(path):
+        return None
+    try:
+        return pd.read_parquet(path, engine="pyarrow", memory_map=True)
+    except (OSError, ValueError):
+        return None
+
+
+# ================= LOADER =================
+def _ingest(key, data, file_name):
+    with profiling.span("read_sidecar"):
+        df = read_sidecar(key)
+    if df is not None:
+        return schema.sort_by_time(schema.coerce_alert_schema(df), reset_index=True)
+
+    fmt = detect_format(data, file_name)
+    with profiling.span(f"parse_{fmt}"):
+        df = PARSERS[fmt](data)
+    with profiling.span("coerce_schema"):
+        df = schema.sort_by_time(schema.coerce_alert_schema(df), reset_index=True)
+
+    # Parquet uploads are already columnar; only slow formats get a sidecar
+    if fmt != "parquet":
+        with profiling.span("write_sidecar"):
+            write_sidecar(key, df)
+    return df
+
+
+def frame_bytes(df):
+    return int(df.memory_usage(index=True, deep=True).sum())
+
+
+def _evict_locked(keep):
+    total = sum(_cache_bytes.values())
+    for key in list(_workbook_cache):
+        if total <= MAX_CACHE_BYTES:
+            break
+        if key == keep or _lease_counts.get(key, 0) > 0:
+            continue
+        del _workbook_cache[key]
+        total -= _cache_bytes.pop(key)
+
+
+def _release(key):
+    with _cache_lock:
+        _lease_counts[key] -= 1
+        if _lease_counts[key] == 0:
+            del _lease_counts[key]
+            _evict_locked(keep=None)
+
+
+class DatasetLease:
+    # Held in a session's state; dropping the last reference (reset, new
+    # upload or the session going away) releases the dataset
+    def __init__(self, key):
+        self.key = key
+        with _cache_lock:
+            _lease_counts[key] = _lease_counts.get(key, 0) + 1
+        weakref.finalize(self, _release, key)
+
+
+def load_alert_export(uploaded_file):
+    key = upload_key(uploaded_file)
+
+    with _cache_lock:
+        if key in _workbook_cache:
+            _workbook_cache.move_to_end(key)
+            return key, _workbook_cache[key]
+
+    df = _ingest(key, uploaded_file.getvalue(), getattr(uploaded_file, "name", ""))
+    size = frame_bytes(df)
+
+    with _cache_lock:
+        # Another session may have finished the same file first
+        if key in _workbook_cache:
+            _workbook_cache.move_to_end(key)
+            return key, _workbook_cache[key]
+        _workbook_cache[key] = df
+        _cache_bytes[key] = size
+        _evict_locked(keep=key)
+    return key, df
@@ -0,0 +1,97 @@
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from openpyxl import Workbook
+
+import data_loader
+import lru
+
+# ================= EXPORTS =================
+# Download files are only built when someone asks for one. The work runs on
+# a small process-wide worker pool and each session keeps its finished files
+# keyed by store state, roles and format, so reruns never rewrite a workbook
+# and a repeated download of unchanged data is served from memory.
+FORMATS = {
+    "Excel":   ("xlsx",    "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+    "CSV":     ("csv",     "text/csv"),
+    "Parquet": ("parquet", "application/octet-stream"),
+}
+
+SHEET_NAME = "Updated Data"
+EXCEL_CHUNK_ROWS = 10_000
+MAX_CACHED_EXPORTS = 3
+
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="alert-export")
+
+
+def format_names():
+    names = list(FORMATS)
+    if not data_loader.HAS_PYARROW:
+        names.remove("Parquet")
+    return names
+
+
+def file_name(fmt):
+    return f"updated_alert_data.{FORMATS[fmt][0]}"
+
+
+def mime_type(fmt):
+    return FORMATS[fmt][1]
+
+
+# ================= WRITERS =================
+def _cell_columns(df):
+    # Missing values become empty cells; categoricals and timestamps are boxed
+    # to plain Python objects openpyxl understands
+    return [
+        df[col].astype(object).where(df[col].notna(), None).tolist()
+        for col in df.columns
+    ]
+
+
+def to_excel(df):
+    # Write-only workbooks stream rows out instead of holding a cell object
+    # for every value; rows are boxed one chunk at a time, so only a chunk's
+    # worth of Python objects exists at once
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(SHEET_NAME)
+    ws.append([str(c) for c in df.columns])
+    for start in range(0, len(df), EXCEL_CHUNK_ROWS):
+        for row in zip(*_cell_columns(df.iloc[start:start + EXCEL_CHUNK_ROWS])):
+            ws.append(row)
+    output = BytesIO()
+    wb.save(output)
+    return output.getvalue()
+
+
+def to_csv(df):
+    return df.to_csv(index=False).encode("utf-8")
+
+
+def to_parquet(df):
+    output = BytesIO()
+    df.to_parquet(output, engine="pyarrow", index=False)
+    return output.getvalue()
+
+
+WRITERS = {
+    "Excel":   to_excel,
+    "CSV":     to_csv,
+    "Parquet": to_parquet,
+}
+
+
+# ================= JOBS =================
+def new_cache():
+    return lru.new_cache()
+
+
+def job(cache, key):
+    return lru.get(cache, key)
+
+
+def submit(cache, key, df, fmt):
+    # The frame must not be modified afterwards; store frames never are
+    return lru.cached(
+        cache, key, lambda: _executor.submit(WRITERS[fmt], df), MAX_CACHED_EXPORTS
+    )
@@ -0,0 +1,58 @@
+import numpy as np
+import plotly.graph_objects as go
+
+import lru
+
+# ================= FIGURE CACHE =================
+# Chart specs are cached per session, keyed by (store state, filter tuple,
+# chart id), so a rerun triggered by an unrelated widget hands Streamlit the
+# stored spec instead of rebuilding the figure. Figures are built from the
+# small aggregate arrays the tabs already hold, never from row frames.
+MAX_CACHED_FIGURES = 64
+
+
+def new_cache():
+    return lru.new_cache()
+
+
+def cached(cache, key, build):
+    return lru.cached(cache, key, lambda: build().to_plotly_json(), MAX_CACHED_FIGURES)
+
+
+# ================= BUILDERS =================
+def _numbers(values):
+    return np.asarray(values).tolist()
+
+
+def bar(x, y, xaxis_title, yaxis_title, color_by_x=False):
+    x, y = _numbers(x), _numbers(y)
+    if color_by_x:
+        # One trace per bar, as a colour-by-category bar chart draws it
+        traces = [go.Bar(x=[xi], y=[yi], text=[yi], name=str(xi)) for xi, yi in zip(x, y)]
+    else:
+        traces = [go.Bar(x=x, y=y, text=y)]
+    fig = go.Figure(traces)
+    fig.update_layout(
+        xaxis_title=xaxis_title,
+        yaxis_title=yaxis_title,
+        xaxis=dict(type="category"),
+        showlegend=False
+    )
+    return fig
+
+
+def stacked_bar(x, series_names, matrix, yaxis_title, legend_title):
+    # matrix[i, j] is the value of series j at x[i]
+    x = _numbers(x)
+    fig = go.Figure([
+        go.Bar(x=x, y=_numbers(matrix[:, j]), text=_numbers(matrix[:, j]), name=str(name))
+        for j, name in enumerate(series_names)
+    ])
+    fig.update_layout(
+        barmode="stack",
+        xaxis_title="",
+        yaxis_title=yaxis_title,
+        legend_title=legend_title,
+        xaxis=dict(type="category")
+    )
+    return fig
@@ -0,0 +1,147 @@
+import numpy as np
+import pandas as pd
+
+import alert_store
+import lru
+import schema
+
+# ================= FILTER PIPELINE =================
+# The store's base segment gets its indexes once per generation and a Role
+# column once per generation and roles map; every filter combination is
+# reduced to a range or array of base row positions. The small tail segment (created and updated
+# alerts) is re-derived per store version and filtered with a plain scan.
+# Tabs receive frames gathered from those positions and must treat them as
+# read-only; nothing downstream copies or writes into them.
+#
+# The base is sorted by deviationTime so a period is a searchsorted slice,
+# and each system keeps its sorted row positions, making a filter change
+# O(log n + k) instead of a scan over every row.
+MAX_CACHED_SELECTIONS = 32
+
+
+def new_cache():
+    return {
+        "index_key":  None,
+        "base_key":   None,
+        "base":       None,
+        "times":      None,
+        "by_system":  None,
+        "selections": lru.new_cache(),
+        "tail_key":   None,
+        "tail":       None,
+        "view_key":   None,
+        "view":       None,
+    }
+
+
+def roles_key(people_roles):
+    # Hashable form of a roles map, for cache keys
+    return tuple(sorted(people_roles.items()))
+
+
+def with_role(df, people_roles):
+    return schema.with_columns(
+        df, Role=schema.remap_categorical(df["currentAssignee"], people_roles, default="Other")
+    )
+
+
+# ================= INDEXES =================
+def system_positions(df):
+    codes  = df["systemName"].cat.codes.to_numpy()
+    order  = np.argsort(codes, kind="stable")
+    counts = np.bincount(codes[codes >= 0], minlength=len(df["systemName"].cat.categories))
+    start  = int((codes < 0).sum())
+    index  = {}
+    for label, count in zip(df["systemName"].cat.categories, counts):
+        index[label] = order[start:start + count]
+        start += count
+    return index
+
+
+# ================= WORKING FRAMES =================
+def refresh(cache, store, people_roles):
+    roles = roles_key(people_roles)
+
+    # Times and system positions do not depend on roles, so a role edit only
+    # relabels the Role column
+    if cache["index_key"] != store["generation"]:
+        cache["index_key"]  = store["generation"]
+        cache["times"]      = store["base"]["deviationTime"].to_numpy()
+        cache["by_system"]  = system_positions(store["base"])
+        cache["selections"] = lru.new_cache()
+
+    base_key = (store["generation"], roles)
+    if cache["base_key"] != base_key:
+        cache["base_key"] = base_key
+        cache["base"]     = with_role(store["base"], people_roles)
+
+    tail_key = (store["generation"], store["version"], roles)
+    if cache["tail_key"] != tail_key:
+        cache["tail_key"] = tail_key
+        cache["tail"]     = with_role(alert_store.tail_frame(store), people_roles)
+        cache["view_key"] = None
+
+
+# ================= ROW SELECTION =================
+def period_bounds(start_date, end_date):
+    # Whole days, inclusive at both ends, so the rows always agree with the
+    # day-level count cube
+    return (
+        pd.to_datetime(start_date).to_datetime64(),
+        (pd.to_datetime(end_date) + pd.Timedelta(days=1)).to_datetime64(),
+    )
+
+
+def filter_positions(cache, start_date, end_date, system):
+    # A slice for all systems, so a cached period costs nothing per row; an
+    # array of sorted positions for one system. NaT sorts last and never
+    # falls inside a period.
+    start, stop = period_bounds(start_date, end_date)
+    times = cache["times"]
+    lo = int(times.searchsorted(start, side="left"))
+    hi = int(times.searchsorted(stop, side="left"))
+
+    if system == "All":
+        return slice(lo, hi)
+
+    positions = cache["by_system"].get(system, np.empty(0, dtype=np.intp))
+    return positions[positions.searchsorted(lo):positions.searchsorted(hi)]
+
+
+def selection(cache, start_date, end_date, system):
+    return lru.cached(
+        cache["selections"], (start_date, end_date, system),
+        lambda: filter_positions(cache, start_date, end_date, system),
+        MAX_CACHED_SELECTIONS
+    )
+
+
+def _filter_tail(tail, start_date, end_date, system):
+    start, stop = period_bounds(start_date, end_date)
+    times = tail["deviationTime"].to_numpy()
+    mask  = (times >= start) & (times < stop)
+    if system != "All":
+        mask = mask & (tail["systemName"] == system).to_numpy()
+    return tail[mask]
+
+
+def filtered_view(cache, store, start_date, end_date, system):
+    # Only the current combination is materialized; others keep positions only
+    view_key = ((start_date, end_date, system), cache["tail_key"])
+    if cache["view_key"] != view_key:
+        positions = selection(cache, start_date, end_date, system)
+        alive     = store["alive"][positions]
+        if not alive.all():
+            if isinstance(positions, slice):
+                positions = positions.start + np.flatnonzero(alive)
+            else:
+                positions = positions[alive]
+        view = cache["base"].iloc[positions]
+
+        tail_rows = _filter_tail(cache["tail"], start_date, end_date, system)
+        if len(tail_rows):
+            view = schema.sort_by_time(schema.concat_frames([view, tail_rows]))
+
+        cache["view_key"] = view_key
+        cache["view"]     = view
+    return cache["view"]
@@ -0,0 +1,32 @@
+from collections import OrderedDict
+
+# ================= BOUNDED CACHES =================
+# Per-session caches (figure specs, tab results, filter selections, export
+# jobs) are small LRU maps: a hit moves the entry to the newest end and an
+# insert drops entries from the oldest end past the owner's limit.
+
+
+def new_cache():
+    return OrderedDict()
+
+
+def get(cache, key, default=None):
+    if key in cache:
+        cache.move_to_end(key)
+        return cache[key]
+    return default
+
+
+def put(cache, key, value, max_entries):
+    cache[key] = value
+    cache.move_to_end(key)
+    while len(cache) > max_entries:
+        cache.popitem(last=False)
+    return value
+
+
+def cached(cache, key, build, max_entries):
+    if key in cache:
+        cache.move_to_end(key)
+        return cache[key]
+    return put(cache, key, build(), max_entries)
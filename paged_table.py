@@ -0,0 +1,80 @@
+import math
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+import schema
+
+# ================= PAGED TABLE =================
+# Large tables are searched and sorted on the server as arrays of row
+# positions; only the rows of the visible page are gathered and turned into
+# display columns. Categorical columns are searched through their category
+# labels and sorted by their codes (category lists are kept sorted).
+PAGE_SIZES = [25, 50, 100, 250]
+
+
+def search_mask(df, columns, text):
+    text = text.strip()
+    mask = np.zeros(len(df), dtype=bool)
+    if not text:
+        return ~mask
+    for col in columns:
+        values = df[col]
+        if schema.is_categorical(values):
+            hits = values.cat.categories.astype(str).str.contains(text, case=False, regex=False)
+            lookup = np.append(np.asarray(hits, dtype=bool), False)
+            mask |= lookup[values.cat.codes.to_numpy()]
+        else:
+            mask |= values.astype(str).str.contains(text, case=False, regex=False).to_numpy() \
+                    & values.notna().to_numpy()
+    return mask
+
+
+def sort_order(df, positions, column, ascending):
+    # Stable within equal keys; missing values sort last either way
+    values = df[column]
+    if schema.is_categorical(values):
+        keys = pd.Series(values.cat.codes.to_numpy()[positions]).replace(-1, np.nan)
+    else:
+        keys = pd.Series(values.to_numpy()[positions])
+    order = keys.sort_values(ascending=ascending, kind="stable", na_position="last").index
+    return positions[order.to_numpy()]
+
+
+def state_keys(key):
+    # Widget keys holding a table's search, sort and page state
+    return [f"{key}_{name}" for name in ("search", "sort", "dir", "size", "page")]
+
+
+def render(df, build_page, key, search_columns, sort_columns):
+    # build_page turns the page's rows (a small frame) into the display frame
+    ctrl_search, ctrl_sort, ctrl_dir, ctrl_size = st.columns([3, 2, 1, 1])
+    text       = ctrl_search.text_input("Search", key=f"{key}_search")
+    sort_label = ctrl_sort.selectbox("Sort By", list(sort_columns), key=f"{key}_sort")
+    descending = ctrl_dir.selectbox("Order", ["Asc", "Desc"], key=f"{key}_dir") == "Desc"
+    page_size  = ctrl_size.selectbox("Rows", PAGE_SIZES, key=f"{key}_size")
+
+    positions = np.flatnonzero(search_mask(df, search_columns, text))
+    positions = sort_order(df, positions, sort_columns[sort_label], not descending)
+
+    total = len(positions)
+    pages = max(1, math.ceil(total / page_size))
+    if st.session_state.get(f"{key}_page", 1) > pages:
+        st.session_state[f"{key}_page"] = pages
+    page  = st.number_input(
+        f"Page (of {pages})", min_value=1, max_value=pages, step=1,
+        key=f"{key}_page"
+    )
+
+    start = (int(page) - 1) * page_size
+    shown = positions[start:start + page_size]
+    if not len(shown):
+        st.info("No records found.")
+        return total
+
+    st.caption(f"Showing {start + 1}–{start + len(shown)} of {total} rows")
+    st.dataframe(
+        build_page(df.iloc[shown]).reset_index(drop=True), use_container_width=True
+    )
+    return total
@@ -0,0 +1,38 @@
+import streamlit as st
+import pandas as pd
+
+import profiling
+
+
+def render(profile):
+
+    st.sidebar.markdown("---")
+    st.sidebar.markdown("### Debug")
+    st.sidebar.checkbox("Profile reruns", key="profile_enabled")
+
+    if profile is None:
+        return
+
+    with st.sidebar.expander("Last Rerun Profile", expanded=False):
+        st.markdown(
+            f"**{profile['seconds'] * 1000:.1f} ms** total, "
+            f"peak traced memory **{profile['memory_peak'] / 1024 ** 2:.1f} MB**"
+        )
+
+        spans_df = pd.DataFrame({
+            "Stage":       ["  " * (len(s["path"]) - 1) + s["path"][-1] for s in profile["spans"]],
+            "ms":          [round(s["seconds"] * 1000, 2) for s in profile["spans"]],
+            "Memory (KB)": [round(s["memory_delta"] / 1024, 1) for s in profile["spans"]],
+        })
+        st.dataframe(spans_df, use_container_width=True, hide_index=True)
+
+        st.download_button(
+            "Download JSON", profiling.to_json(profile),
+            file_name="rerun_profile.json", mime="application/json",
+            key="profile_json_btn"
+        )
+        st.download_button(
+            "Download Folded Stacks", profiling.to_folded(profile),
+            file_name="rerun_profile.folded", mime="text/plain",
+            key="profile_folded_btn"
+        )
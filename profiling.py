@@ -0,0 +1,154 @@
+import json
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+# ================= RERUN PROFILING =================
+# Named, nested spans around the stages of one script run, with wall time
+# and the net memory each stage allocated (tracemalloc). Streamlit runs each
+# session's script on its own thread, so the current run is thread-local;
+# it is also kept in the session's state, because a rerun may start on a
+# fresh thread before the interrupted one reached finish_run.
+# When profiling is off span() hands back one shared no-op context manager,
+# so instrumented code pays a lookup and nothing else.
+
+
+class _NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+_local = threading.local()
+
+# tracemalloc is process-wide; it runs while any session is profiling
+_tracing_runs = 0
+_tracing_lock = threading.Lock()
+
+RUN_KEY = "_profiling_run"
+
+
+def start_run(state, enabled=False, memory=True):
+    global _tracing_runs
+    # A run that ended early (st.stop, an interrupting rerun) never reached
+    # finish_run; whichever thread it ran on, its tracing is released here
+    for stale in (state.pop(RUN_KEY, None), getattr(_local, "run", None)):
+        if stale is not None:
+            _release(stale)
+    _local.run = None
+    if not enabled:
+        return
+
+    if memory:
+        with _tracing_lock:
+            if _tracing_runs == 0 and not tracemalloc.is_tracing():
+                tracemalloc.start()
+            _tracing_runs += 1
+
+    run = {
+        "spans":    [],
+        "stack":    [],
+        "memory":   memory,
+        "released": False,
+        "started":  time.perf_counter(),
+    }
+    state[RUN_KEY] = run
+    _local.run     = run
+
+
+def span(name):
+    run = getattr(_local, "run", None)
+    if run is None:
+        return _NULL_SPAN
+    return _span(run, name)
+
+
+@contextmanager
+def _span(run, name):
+    run["stack"].append(name)
+    path = tuple(run["stack"])
+    mem_before = tracemalloc.get_traced_memory()[0] if run["memory"] else 0
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - started
+        mem_after = tracemalloc.get_traced_memory()[0] if run["memory"] else 0
+        run["stack"].pop()
+        run["spans"].append({
+            "path":         path,
+            "start":        started - run["started"],
+            "seconds":      seconds,
+            "memory_delta": mem_after - mem_before,
+        })
+
+
+def _release(run):
+    # Stops tracemalloc once no run needs it; False when a newer run already
+    # released this one
+    global _tracing_runs
+    with _tracing_lock:
+        if run["released"]:
+            return False
+        run["released"] = True
+        if run["memory"]:
+            _tracing_runs -= 1
+            if _tracing_runs == 0:
+                tracemalloc.stop()
+    return True
+
+
+def finish_run(state):
+    # Returns the finished run's profile, or None when it was not profiled
+    run = getattr(_local, "run", None)
+    _local.run = None
+    if run is None:
+        return None
+    if state.get(RUN_KEY) is run:
+        del state[RUN_KEY]
+
+    peak = 0
+    if run["memory"] and tracemalloc.is_tracing():
+        peak = tracemalloc.get_traced_memory()[1]
+    if not _release(run):
+        return None
+
+    spans = sorted(run["spans"], key=lambda s: s["start"])
+    return {
+        "seconds":     time.perf_counter() - run["started"],
+        "memory_peak": peak,
+        "spans":       spans,
+    }
+
+
+# ================= EXPORTS =================
+def self_times(profile):
+    # Time in each span minus the time in its direct children
+    own = {}
+    for s in profile["spans"]:
+        own[s["path"]] = own.get(s["path"], 0.0) + s["seconds"]
+    for s in profile["spans"]:
+        if len(s["path"]) > 1:
+            parent = s["path"][:-1]
+            own[parent] = own.get(parent, 0.0) - s["seconds"]
+    return own
+
+
+def to_json(profile):
+    return json.dumps({
+        **profile,
+        "spans": [{**s, "path": list(s["path"])} for s in profile["spans"]],
+    }, indent=2)
+
+
+def to_folded(profile):
+    # Collapsed-stack lines ("a;b;c <microseconds>") for flamegraph.pl,
+    # speedscope and similar viewers
+    return "\n".join(
+        f"{';'.join(path)} {max(0, int(round(seconds * 1e6)))}"
+        for path, seconds in self_times(profile).items()
+    ) + "\n"
@@ -0,0 +1,150 @@
+import os
+import sqlite3
+import threading
+
+import numpy as np
+import pandas as pd
+
+import aggregates
+import alert_store
+import data_loader
+import schema
+import time_buckets
+
+# ================= QUERY ENGINES =================
+# The Overview and Statistics charts only need alert counts per
+# (day, system, status, assignee) for a period and system. The default
+# "pandas" engine answers that from the in-memory count cube. The "sqlite"
+# engine keeps those dimensions of the export in an indexed SQLite file next
+# to the Parquet sidecar and pulls only the grouped counts into memory, for
+# histories too large to aggregate in pandas.
+#
+# The SQLite file holds the export as uploaded (raw names) and is shared by
+# every session on it; each session's created/updated alerts are kept as a
+# small in-memory delta cube and added to the query result, and names are
+# mapped to the session's display names on the way out.
+ENGINE = os.environ.get("ALERT_QUERY_ENGINE", "pandas")
+ENGINES = ["pandas", "sqlite"]
+
+TABLE = "alert_counts"
+INSERT_CHUNK_ROWS = 100_000
+
+_build_locks = {}
+_locks_lock = threading.Lock()
+
+
+def open_engine(store, dataset_key, df_raw, mappings, name=None):
+    # Either engine keeps a cube in step with the store's create/update
+    # deltas: all rows for pandas, only the edits for sqlite
+    name = name or ENGINE
+    if name not in ENGINES:
+        raise ValueError(f"Unknown query engine '{name}'; expected one of {ENGINES}")
+
+    if name == "pandas":
+        cube = aggregates.build_cube(store["base"])
+    else:
+        cube = aggregates.build_cube(store["base"].iloc[:0])
+    alert_store.subscribe(
+        store, lambda removed, added: aggregates.apply_delta(cube, removed, added)
+    )
+
+    engine = {"name": name, "cube": cube}
+    if name == "sqlite":
+        engine["path"]     = build_database(dataset_key, df_raw)
+        engine["mappings"] = mappings
+    return engine
+
+
+# ================= SQLITE DATABASE =================
+def database_path(key):
+    return os.path.join(data_loader.SIDECAR_DIR, f"{key}.v{data_loader.FORMAT_VERSION}.sqlite")
+
+
+def _path_lock(path):
+    # One build per database file; different datasets build concurrently
+    with _locks_lock:
+        return _build_locks.setdefault(path, threading.Lock())
+
+
+def _insert_rows(conn, df):
+    # Rows are converted to Python values a chunk at a time, never the whole
+    # export at once
+    for start in range(0, len(df), INSERT_CHUNK_ROWS):
+        chunk = df.iloc[start:start + INSERT_CHUNK_ROWS]
+        times = chunk["deviationTime"].to_numpy()
+        keep  = ~np.isnat(times)
+        columns = [
+            time_buckets.day_codes(times[keep]).tolist(),
+            *[chunk[col].astype(object).to_numpy()[keep].tolist()
+              for col in aggregates.DIMENSIONS[1:]],
+        ]
+        conn.executemany(f"INSERT INTO {TABLE} VALUES (?, ?, ?, ?)", zip(*columns))
+
+
+def build_database(key, df):
+    path = database_path(key)
+    with _path_lock(path):
+        if os.path.exists(path):
+            return path
+
+        os.makedirs(data_loader.SIDECAR_DIR, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+        conn = sqlite3.connect(tmp_path)
+        try:
+            conn.execute(
+                f"CREATE TABLE {TABLE} (day INTEGER, systemName TEXT, "
+                f"status TEXT, currentAssignee TEXT)"
+            )
+            _insert_rows(conn, df)
+            conn.execute(f"CREATE INDEX idx_{TABLE}_day ON {TABLE} (day)")
+            conn.execute(f"CREATE INDEX idx_{TABLE}_system ON {TABLE} (systemName, day)")
+            conn.execute(f"CREATE INDEX idx_{TABLE}_status ON {TABLE} (status)")
+            conn.commit()
+        finally:
+            conn.close()
+        os.replace(tmp_path, path)
+    return path
+
+
+def _raw_names(mapping, display):
+    return [raw for raw, shown in mapping.items() if shown == display] or [display]
+
+
+def _sqlite_counts(engine, start_date, end_date, system):
+    start, end = (
+        int(time_buckets.day_codes(np.datetime64(pd.Timestamp(d).date(), "D")))
+        for d in (start_date, end_date)
+    )
+    sql = (
+        f"SELECT day, systemName, status, currentAssignee, COUNT(*) AS count "
+        f"FROM {TABLE} WHERE day BETWEEN ? AND ?"
+    )
+    params = [start, end]
+    if system != "All":
+        raw = _raw_names(engine["mappings"]["systemName"], system)
+        sql += f" AND systemName IN ({', '.join('?' * len(raw))})"
+        params += raw
+    sql += " GROUP BY day, systemName, status, currentAssignee"
+
+    conn = sqlite3.connect(engine["path"])
+    try:
+        counts = pd.read_sql_query(sql, conn, params=params)
+    finally:
+        conn.close()
+
+    counts["day"] = counts["day"].to_numpy(dtype=np.int64).astype("datetime64[D]")
+    for col, mapping in engine["mappings"].items():
+        counts[col] = schema.remap_categorical(counts[col], mapping)
+    return counts
+
+
+# ================= QUERIES =================
+def period_counts(engine, start_date, end_date, system="All"):
+    if engine["name"] == "pandas":
+        return aggregates.slice_cube(engine["cube"], start_date, end_date, system)
+
+    edits = aggregates.slice_cube(engine["cube"], start_date, end_date, system)
+    return aggregates.merge_counts([_sqlite_counts(engine, start_date, end_date, system), edits])
@@ -0,0 +1,169 @@
+import numpy as np
+import pandas as pd
+
+# ================= ALERT SCHEMA =================
+# Low-cardinality text columns are held as categoricals so filters and
+# groupbys run on integer codes; numeric IDs are narrowed to compact ints.
+CATEGORICAL_COLUMNS = [
+    "systemName", "status", "currentAssignee", "lastActionTakenBy",
+    "stageID", "odsCauseTagName", "Role"
+]
+
+INTEGER_ID_COLUMNS = ["requestID", "odsCauseTagID"]
+
+
+def is_categorical(series):
+    return isinstance(series.dtype, pd.CategoricalDtype)
+
+
+def _sorted_index(labels):
+    try:
+        return pd.Index(sorted(labels))
+    except TypeError:
+        return pd.Index(list(labels))
+
+
+def _compact_int(values):
+    ids = pd.to_numeric(values, errors="coerce")
+    if ids.isna().any() or not (ids % 1 == 0).all():
+        return None
+    info = np.iinfo(np.int32)
+    if ids.empty or (ids.min() >= info.min and ids.max() <= info.max):
+        return ids.astype(np.int32)
+    return ids.astype(np.int64)
+
+
+def coerce_alert_schema(df):
+    converted = {}
+    for col in CATEGORICAL_COLUMNS:
+        if col in df.columns and not is_categorical(df[col]):
+            values = df[col]
+            converted[col] = values.astype(
+                pd.CategoricalDtype(_sorted_index(values.dropna().unique()))
+            )
+    for col in INTEGER_ID_COLUMNS:
+        if col in df.columns and df[col].dtype != np.int32:
+            ids = _compact_int(df[col])
+            if ids is not None and ids.dtype != df[col].dtype:
+                converted[col] = ids
+    return df.assign(**converted) if converted else df
+
+
+# ================= ROW ORDER =================
+def sort_by_time(df, reset_index=False):
+    # Stable, NaT last; frames already in order are returned as they are
+    times = df["deviationTime"].to_numpy()
+    order = np.argsort(times, kind="stable")
+    if not (order == np.arange(len(order))).all():
+        df = df.iloc[order]
+    elif not reset_index or df.index.equals(pd.RangeIndex(len(df))):
+        return df
+    return df.reset_index(drop=True) if reset_index else df
+
+
+def with_columns(df, **columns):
+    # Like assign, but the untouched columns are shared rather than copied,
+    # so frames derived from a cached dataset cost only the new columns
+    data = {col: columns.pop(col, df[col]) for col in df.columns}
+    data.update(columns)
+    return pd.DataFrame(data, index=df.index, copy=False)
+
+
+# ================= CATEGORY RELABELLING =================
+def remap_categorical(series, mapping, default=None):
+    # Relabels the categories and takes the new codes in one vectorized pass.
+    # With no default unmapped labels keep their name and missing stays missing;
+    # with a default both unmapped labels and missing values take the default.
+    if not is_categorical(series):
+        series = series.astype("category")
+
+    old_categories = series.cat.categories
+    if default is None:
+        labels = [mapping.get(c, c) for c in old_categories]
+    else:
+        labels = [mapping.get(c, default) for c in old_categories] + [default]
+
+    new_categories = _sorted_index(set(labels))
+    lookup = new_categories.get_indexer(labels)
+    codes  = series.cat.codes.to_numpy()
+
+    if default is None and np.array_equal(lookup, np.arange(len(old_categories))):
+        # Renames that merge nothing and keep the sort order only swap labels;
+        # the codes are reused as they are
+        new_codes = codes
+    elif default is None:
+        new_codes = np.where(codes >= 0, lookup[codes], -1)
+    else:
+        new_codes = lookup[codes]
+
+    return pd.Series(
+        pd.Categorical.from_codes(new_codes, new_categories),
+        index=series.index,
+        name=series.name
+    )
+
+
+def category_lookup(series, label_value, dtype):
+    # label_value runs once per distinct label and rows take their value by
+    # code; missing labels have code -1, which lands on the trailing zero
+    if not is_categorical(series):
+        series = series.astype("category")
+    lookup = np.array([label_value(c) for c in series.cat.categories] + [0], dtype=dtype)
+    return lookup[series.cat.codes.to_numpy()]
+
+
+# ================= SEGMENTS =================
+def sorted_labels(labels):
+    return list(_sorted_index(list(labels)))
+
+
+def category_labels(series):
+    # Sorted distinct non-missing labels; O(categories) for categoricals
+    if is_categorical(series):
+        return sorted_labels(series.cat.categories)
+    return sorted_labels(series.dropna().unique())
+
+
+def align_dtypes(frame, like):
+    # Gives rows built from dicts the dtypes of an existing frame; labels the
+    # frame has never seen are added to the (sorted) category list
+    for col in like.columns.intersection(frame.columns):
+        if is_categorical(like[col]):
+            current = like[col].cat.categories
+            new = [v for v in pd.unique(frame[col].astype(object))
+                   if not pd.isna(v) and v not in current]
+            categories = _sorted_index(list(current) + new) if new else current
+            frame[col] = frame[col].astype(pd.CategoricalDtype(categories))
+        elif like[col].dtype.kind == "M":
+            frame[col] = pd.to_datetime(frame[col], errors="coerce")
+        elif col in INTEGER_ID_COLUMNS and like[col].dtype.kind in "iu":
+            ids = _compact_int(frame[col])
+            if ids is not None:
+                frame[col] = ids
+        elif like[col].dtype.kind in "fiu":
+            # Form fields arrive as text; Arrow refuses a column mixing the
+            # base's numbers with the tail's strings
+            frame[col] = pd.to_numeric(frame[col], errors="coerce")
+    return frame
+
+
+def concat_frames(frames, ignore_index=False):
+    # pd.concat turns categoricals with different categories into object
+    # columns, so the category lists are unified first
+    frames = [f for f in frames if len(f)] or frames[:1]
+    if len(frames) == 1:
+        return frames[0].reset_index(drop=True) if ignore_index else frames[0]
+
+    frames = [f.copy(deep=False) for f in frames]
+    for col in frames[0].columns:
+        if not all(col in f.columns and is_categorical(f[col]) for f in frames):
+            continue
+        categories = frames[0][col].cat.categories
+        for f in frames[1:]:
+            if not f[col].cat.categories.equals(categories):
+                categories = _sorted_index(set(categories) | set(f[col].cat.categories))
+        dtype = pd.CategoricalDtype(categories)
+        for f in frames:
+            if f[col].dtype != dtype:
+                f[col] = f[col].astype(dtype)
+    return pd.concat(frames, ignore_index=ignore_index)
@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+
+import schema
+
+# ================= STATUS CLASSES =================
+# Each distinct status label is matched once (case-insensitive substring)
+# against every class and reduced to a bitmask. Rows are then classified by
+# looking their category code up in that small table.
+STATUS_CLASSES = {
+    "closed":      "closed",
+    "pending":     "pending",
+    "implemented": "implemented",
+    "rejected":    "rejected",
+    "progress":    "progress",
+    "overdue":     "overdue",
+    "auto_closed": "system",
+}
+
+BITS = {name: 1 << i for i, name in enumerate(STATUS_CLASSES)}
+
+
+def label_bits(label):
+    if pd.isna(label):
+        return 0
+    text = str(label).lower()
+    bits = 0
+    for name, needle in STATUS_CLASSES.items():
+        if needle in text:
+            bits |= BITS[name]
+    return bits
+
+
+def row_bits(status):
+    return schema.category_lookup(status, label_bits, np.uint16)
+
+
+def has_class(status, name):
+    return (row_bits(status) & BITS[name]) != 0
+
+
+def is_active(status):
+    return ~has_class(status, "closed")
+
+
+def count_older_than(status, times, name, days, now=None):
+    # Equivalent to (now - time).days > days for rows of the given class
+    now    = pd.Timestamp.today() if now is None else now
+    cutoff = (now - pd.Timedelta(days=days + 1)).to_datetime64()
+    rows   = has_class(status, name)
+    return int((times.to_numpy()[rows] <= cutoff).sum())
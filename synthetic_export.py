@@ -0,0 +1,133 @@
+import argparse
+from io import BytesIO
+
+import numpy as np
+import pandas as pd
+from openpyxl import Workbook
+
+# ================= SYNTHETIC ALERT EXPORTS =================
+# Generates alert exports shaped like the real ones: a title row above the
+# header row and the columns the dashboard reads. Systems, tags, assignees
+# and the status mix are configurable; everything is drawn from a seeded
+# generator so a given configuration always produces the same file.
+COLUMNS = [
+    "requestID", "systemName", "odsCauseTagName", "odsCauseTagID", "causeMessage",
+    "causeValueActual", "causeValueOptimum", "gap", "suggestion", "causeUom",
+    "lastOccurrence", "deviationTime", "status", "dueDate", "stageID",
+    "currentAssignee", "lastActionTakenBy", "comments",
+]
+
+DEFAULT_STATUS_MIX = {
+    "Pending":          0.30,
+    "Work In Progress": 0.15,
+    "Implemented":      0.12,
+    "Rejected":         0.05,
+    "Overdue":          0.10,
+    "Closed":           0.20,
+    "System Closed":    0.08,
+}
+
+TAG_THEMES = ["ENERGY", "FLARE", "THROUGHPUT", "EMISSION", "RATE", "TEMP", "PRESSURE"]
+TITLE = "Alert Export"
+
+
+def generate_alerts(rows, systems=12, tags=200, assignees=40, days=365,
+                    status_mix=None, seed=0, start="2024-01-01"):
+    rng = np.random.default_rng(seed)
+    status_mix = status_mix or DEFAULT_STATUS_MIX
+    statuses = list(status_mix)
+    weights  = np.array([status_mix[s] for s in statuses], dtype=float)
+
+    system_names = np.array([f"SYSTEM {i:02d}" for i in range(systems)], dtype=object)
+    tag_names    = np.array(
+        [f"{TAG_THEMES[i % len(TAG_THEMES)]}_TAG_{i:04d}" for i in range(tags)], dtype=object
+    )
+    people       = np.array([f"Person {i:03d}" for i in range(assignees)], dtype=object)
+
+    # Each tag belongs to one system, so the per-system tag lists are realistic
+    tag_codes    = rng.integers(0, tags, rows)
+    tag_system   = rng.integers(0, systems, tags)
+    causes       = np.array([f"Deviation on {t}" for t in tag_names], dtype=object)
+
+    actual  = rng.normal(100, 15, rows).round(2)
+    optimum = rng.normal(100, 5, rows).round(2)
+    times   = pd.Timestamp(start) + pd.to_timedelta(rng.integers(0, days * 86400, rows), unit="s")
+
+    return pd.DataFrame({
+        "requestID":         np.arange(1, rows + 1),
+        "systemName":        system_names[tag_system[tag_codes]],
+        "odsCauseTagName":   tag_names[tag_codes],
+        "odsCauseTagID":     tag_codes + 1000,
+        "causeMessage":      causes[tag_codes],
+        "causeValueActual":  actual,
+        "causeValueOptimum": optimum,
+        "gap":               np.abs(actual - optimum).round(2),
+        "suggestion":        "Review set point",
+        "causeUom":          "t/h",
+        "lastOccurrence":    times - pd.to_timedelta(rng.integers(1, 30, rows), unit="D"),
+        "deviationTime":     times,
+        "status":            np.array(statuses, dtype=object)[
+                                 rng.choice(len(statuses), rows, p=weights / weights.sum())
+                             ],
+        "dueDate":           (times + pd.Timedelta(days=14)).strftime("%Y-%m-%d"),
+        "stageID":           rng.choice(["Stage 1", "Stage 2", "Stage 3"], rows),
+        "currentAssignee":   people[rng.integers(0, assignees, rows)],
+        "lastActionTakenBy": people[rng.integers(0, assignees, rows)],
+        "comments":          "",
+    }, columns=COLUMNS)
+
+
+# ================= WRITERS =================
+def to_xlsx_bytes(df):
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Alerts")
+    ws.append([TITLE])
+    ws.append(list(df.columns))
+    columns = [df[c].astype(object).where(df[c].notna(), None).tolist() for c in df.columns]
+    for row in zip(*columns):
+        ws.append(row)
+    output = BytesIO()
+    wb.save(output)
+    return output.getvalue()
+
+
+def to_csv_bytes(df):
+    title = TITLE + "," * (len(df.columns) - 1) + "\n"
+    return title.encode("utf-8") + df.to_csv(index=False).encode("utf-8")
+
+
+WRITERS = {"xlsx": to_xlsx_bytes, "csv": to_csv_bytes}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write a synthetic alert export")
+    parser.add_argument("output")
+    parser.add_argument("--rows",      type=int, default=10_000)
+    parser.add_argument("--systems",   type=int, default=12)
+    parser.add_argument("--tags",      type=int, default=200)
+    parser.add_argument("--assignees", type=int, default=40)
+    parser.add_argument("--days",      type=int, default=365)
+    parser.add_argument("--seed",      type=int, default=0)
+    parser.add_argument(
+        "--status-mix",
+        help="Comma-separated status=weight pairs, e.g. 'Pending=3,Closed=1'"
+    )
+    args = parser.parse_args()
+
+    status_mix = None
+    if args.status_mix:
+        status_mix = {
+            name.strip(): float(weight)
+            for name, weight in (pair.split("=") for pair in args.status_mix.split(","))
+        }
+
+    df = generate_alerts(
+        args.rows, args.systems, args.tags, args.assignees, args.days, status_mix, args.seed
+    )
+    fmt = "csv" if args.output.lower().endswith(".csv") else "xlsx"
+    with open(args.output, "wb") as f:
+        f.write(WRITERS[fmt](df))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,17 @@
 import streamlit as st
 import pandas as pd
 
+import paged_table
 
+
+def _reset_role_field():
+    # Another member's role field starts from that member's own role
+    st.session_state.pop("update_member_role", None)
+
+
+# Member edits rerun only this tab; a committed role reruns the app so the
+# role-dependent views pick it up
+@st.fragment
 def render(all_existing_people):
 
     st.subheader("Admin Controlled — Member Management")
@@ -14,7 +24,9 @@ def render(all_existing_people):
     ]
 
     person_options  = ["Add New Member"] + all_existing_people
-    selected_person = st.selectbox("Select Member", person_options, key="admin_person_select")
+    selected_person = st.selectbox(
+        "Select Member", person_options, key="admin_person_select", on_change=_reset_role_field
+    )
 
     if selected_person == "Add New Member":
         new_name = st.text_input("Enter Full Name", key="new_member_name")
@@ -31,22 +43,21 @@ def render(all_existing_people):
             else:
                 st.session_state["people_roles"][new_name.strip()] = new_role
                 st.success(f"'{new_name.strip()}' added as '{new_role}'.")
-                st.rerun()
+                st.rerun(scope="app")
     else:
         current_role = st.session_state["people_roles"].get(selected_person, "Not Assigned")
         st.info(f"Current Role: **{current_role}**")
 
-        updated_role = st.selectbox(
-            "Change Role To",
-            DEFAULT_ROLES,
-            index=DEFAULT_ROLES.index(current_role) if current_role in DEFAULT_ROLES else 0,
-            key="update_member_role"
-        )
+        if "update_member_role" not in st.session_state:
+            st.session_state["update_member_role"] = (
+                current_role if current_role in DEFAULT_ROLES else DEFAULT_ROLES[0]
+            )
+        updated_role = st.selectbox("Change Role To", DEFAULT_ROLES, key="update_member_role")
 
         if st.button("Update Role", key="update_role_btn"):
             st.session_state["people_roles"][selected_person] = updated_role
             st.success(f"Role of '{selected_person}' updated to '{updated_role}'.")
-            st.rerun()
+            st.rerun(scope="app")
 
     st.markdown("---")
     st.markdown("### Current Member Registry")
@@ -54,4 +65,8 @@ def render(all_existing_people):
         list(st.session_state["people_roles"].items()),
         columns=["Name", "Role"]
     )
-    st.dataframe(registry_df, use_container_width=True)
+    paged_table.render(
+        registry_df, lambda rows: rows, key="registry_table",
+        search_columns=["Name", "Role"],
+        sort_columns={"Name": "Name", "Role": "Role"}
+    )
@@ -1,42 +1,43 @@
 import streamlit as st
 import pandas as pd
 
+import alert_store
+import analytics
+import tag_catalog
 
-def render(df, all_systems):
+# Edits of the update form, dropped when another alert is picked so its
+# fields start from that alert's own values
+UPDATE_FIELD_KEYS = ["upd_status", "upd_due_date", "upd_stage", "upd_assignee", "upd_comments"]
+
+
+def _reset_update_fields():
+    for key in UPDATE_FIELD_KEYS:
+        st.session_state.pop(key, None)
+
+
+def _option(value, options):
+    return value if value in options else (options[0] if options else None)
+
+
+# The forms rerun on their own while they are edited; the whole app only
+# reruns once an alert is actually created or updated
+@st.fragment
+def render(store, catalog, all_systems):
 
     st.subheader("Alert Configuration")
 
-    # ================= NEXT REQUEST ID =================
-    def get_next_request_id(dataframe):
-        existing_ids = pd.to_numeric(dataframe["requestID"], errors="coerce").dropna()
-        if existing_ids.empty:
-            return 1
-        return int(existing_ids.max()) + 1
-
-    # ================= LOOKUP MAPS =================
-    tag_to_cause = df.dropna(subset=["odsCauseTagName", "causeMessage"]) \
-        .drop_duplicates("odsCauseTagName") \
-        .set_index("odsCauseTagName")["causeMessage"].to_dict()
-
-    tag_to_suggestion = df.dropna(subset=["odsCauseTagName", "suggestion"]) \
-        .drop_duplicates("odsCauseTagName") \
-        .set_index("odsCauseTagName")["suggestion"].to_dict() \
-        if "suggestion" in df.columns else {}
-
-    tag_to_uom = df.dropna(subset=["odsCauseTagName", "causeUom"]) \
-        .drop_duplicates("odsCauseTagName") \
-        .set_index("odsCauseTagName")["causeUom"].to_dict() \
-        if "causeUom" in df.columns else {}
-
-    tag_to_id = df.dropna(subset=["odsCauseTagName", "odsCauseTagID"]) \
-        .drop_duplicates("odsCauseTagName") \
-        .set_index("odsCauseTagName")["odsCauseTagID"].to_dict() \
-        if "odsCauseTagID" in df.columns else {}
-
-    existing_stage_ids      = sorted(df["stageID"].dropna().unique().tolist())
-    existing_assignees_list = sorted(df["currentAssignee"].dropna().unique().tolist())
-    existing_statuses       = sorted(df["status"].dropna().unique().tolist())
-    all_alert_ids           = sorted(df["requestID"].dropna().unique().tolist())
+    # ================= LOOKUP LISTS =================
+    # Label lists come from the store and tag metadata from the catalog, both
+    # kept current by create/update deltas
+    lookups = analytics.cached(
+        st.session_state["result_cache"],
+        (store["generation"], store["version"], "config_lookups"),
+        lambda: analytics.config_lookups(store)
+    )
+    existing_stage_ids      = lookups["stage_ids"]
+    existing_assignees_list = lookups["assignees"]
+    existing_statuses       = lookups["statuses"]
+    all_alert_ids           = lookups["alert_ids"]
 
     left_col, right_col = st.columns(2)
 
@@ -49,14 +50,29 @@ def render(df, all_systems):
         upd_alert_id = st.selectbox(
             "Select Alert ID / Request ID",
             all_alert_ids,
-            key="upd_alert_id"
+            key="upd_alert_id",
+            on_change=_reset_update_fields
         )
 
-        upd_row = df[df["requestID"] == upd_alert_id]
-        upd_row = upd_row.iloc[0] if not upd_row.empty else None
+        upd_row = alert_store.get_row(store, upd_alert_id)
 
         if upd_row is not None:
 
+            old_status           = str(upd_row.get("status", ""))
+            current_assignee_val = str(upd_row.get("currentAssignee", ""))
+
+            # The fields start from the selected alert's values; edits then
+            # live in session state, so they survive a visit to another tab
+            defaults = {
+                "upd_status":   _option(old_status,             existing_statuses),
+                "upd_stage":    _option(upd_row.get("stageID"), existing_stage_ids),
+                "upd_assignee": _option(current_assignee_val,   existing_assignees_list),
+                "upd_comments": str(upd_row.get("comments", "")),
+            }
+            for key, value in defaults.items():
+                if key not in st.session_state:
+                    st.session_state[key] = value
+
             # deviationTime — current time, read only
             current_time = pd.Timestamp.now().strftime("%Y-%m-%d %H:%M:%S")
             st.text_input(
@@ -66,38 +82,17 @@ def render(df, all_systems):
                 key="upd_deviation_time"
             )
 
-            # status — dropdown, store old status for popup
-            old_status     = str(upd_row.get("status", ""))
-            current_status = old_status
-            upd_status = st.selectbox(
-                "Status",
-                existing_statuses,
-                index=existing_statuses.index(current_status)
-                      if current_status in existing_statuses else 0,
-                key="upd_status"
-            )
+            # status — dropdown, old status kept for the popup
+            upd_status = st.selectbox("Status", existing_statuses, key="upd_status")
 
             # dueDate — date picker
             upd_due_date = st.date_input("Due Date", key="upd_due_date")
 
             # stageID — dropdown
-            upd_stage = st.selectbox(
-                "Stage ID",
-                existing_stage_ids,
-                index=existing_stage_ids.index(upd_row.get("stageID"))
-                      if upd_row.get("stageID") in existing_stage_ids else 0,
-                key="upd_stage"
-            )
+            upd_stage = st.selectbox("Stage ID", existing_stage_ids, key="upd_stage")
 
             # currentAssignee — dropdown defaulting to existing value
-            current_assignee_val = str(upd_row.get("currentAssignee", ""))
-            upd_assignee = st.selectbox(
-                "Current Assignee",
-                existing_assignees_list,
-                index=existing_assignees_list.index(current_assignee_val)
-                      if current_assignee_val in existing_assignees_list else 0,
-                key="upd_assignee"
-            )
+            upd_assignee = st.selectbox("Current Assignee", existing_assignees_list, key="upd_assignee")
 
             # lastActionTakenBy — auto from existing currentAssignee, read only
             last_action = current_assignee_val
@@ -109,31 +104,26 @@ def render(df, all_systems):
             )
 
             # comments
-            upd_comments = st.text_area(
-                "Comments",
-                value=str(upd_row.get("comments", "")),
-                key="upd_comments"
-            )
+            upd_comments = st.text_area("Comments", key="upd_comments")
 
             if st.button("Update Alert", key="update_alert_btn"):
-                idx = st.session_state["df_master"][
-                    st.session_state["df_master"]["requestID"] == upd_alert_id
-                ].index[0]
-
-                st.session_state["df_master"].at[idx, "deviationTime"]     = pd.Timestamp.now()
-                st.session_state["df_master"].at[idx, "status"]            = upd_status
-                st.session_state["df_master"].at[idx, "dueDate"]           = str(upd_due_date)
-                st.session_state["df_master"].at[idx, "stageID"]           = upd_stage
-                st.session_state["df_master"].at[idx, "lastActionTakenBy"] = last_action
-                st.session_state["df_master"].at[idx, "currentAssignee"]   = upd_assignee
-                st.session_state["df_master"].at[idx, "comments"]          = upd_comments
-
-                # Store for popup
+                alert_store.update_row(store, upd_alert_id, {
+                    "deviationTime":     pd.Timestamp.now(),
+                    "status":            upd_status,
+                    "dueDate":           str(upd_due_date),
+                    "stageID":           upd_stage,
+                    "lastActionTakenBy": last_action,
+                    "currentAssignee":   upd_assignee,
+                    "comments":          upd_comments
+                })
+
+                # Store for popup, shown after the app has picked up the edit
                 st.session_state["updated_alert_info"] = {
                     "alert_id":   upd_alert_id,
                     "old_status": old_status,
                     "new_status": upd_status
                 }
+                st.rerun(scope="app")
 
             # ================= UPDATE POPUP =================
             if "updated_alert_info" in st.session_state and st.session_state["updated_alert_info"] is not None:
@@ -161,22 +151,16 @@ def render(df, all_systems):
 
         new_system = st.selectbox("System Name", all_systems, key="new_system")
 
-        tags_for_system = sorted(
-            df[df["systemName"] == new_system]["odsCauseTagName"].dropna().unique().tolist()
-        )
+        tags_for_system = tag_catalog.tags_for_system(catalog, new_system)
         new_tag = st.selectbox("ODS Cause Tag Name", tags_for_system, key="new_tag")
 
         # ================= AUTO VALUES =================
-        auto_cause           = tag_to_cause.get(new_tag, "")
-        auto_suggestion      = tag_to_suggestion.get(new_tag, "")
-        auto_uom             = tag_to_uom.get(new_tag, "")
-        auto_tag_id          = tag_to_id.get(new_tag, "")
-
-        last_occ_df = df[
-            (df["systemName"] == new_system) &
-            (df["odsCauseTagName"] == new_tag)
-        ]["deviationTime"].dropna()
-        auto_last_occurrence = last_occ_df.max() if not last_occ_df.empty else "N/A"
+        defaults             = analytics.tag_defaults(catalog, new_system, new_tag)
+        auto_cause           = defaults["cause"]
+        auto_suggestion      = defaults["suggestion"]
+        auto_uom             = defaults["uom"]
+        auto_tag_id          = defaults["tag_id"]
+        auto_last_occurrence = defaults["last_occurrence"]
 
         # ================= USER FIELDS =================
         st.markdown("**Fill In Fields**")
@@ -184,11 +168,10 @@ def render(df, all_systems):
         new_cause_actual  = st.text_input("Cause Value Actual",  key="new_cause_actual")
         new_cause_optimum = st.text_input("Cause Value Optimum", key="new_cause_optimum")
 
-        try:
-            new_gap = abs(float(new_cause_actual) - float(new_cause_optimum))
+        new_gap = analytics.cause_gap(new_cause_actual, new_cause_optimum)
+        if new_gap != "":
             st.info(f"Gap (auto-calculated): **{new_gap}**")
-        except:
-            new_gap = ""
+        else:
             st.info("Gap: enter numeric values above to calculate")
 
         new_due_date = st.date_input("Due Date",        key="new_due_date")
@@ -198,7 +181,7 @@ def render(df, all_systems):
 
         # ================= CREATE BUTTON =================
         if st.button("Create Alert", key="create_alert_btn"):
-            next_id = get_next_request_id(st.session_state["df_master"])
+            next_id = alert_store.next_request_id(store)
 
             new_row = {
                 "requestID":         next_id,
@@ -221,12 +204,10 @@ def render(df, all_systems):
                 "comments":          new_comments
             }
 
-            st.session_state["df_master"] = pd.concat(
-                [st.session_state["df_master"], pd.DataFrame([new_row])],
-                ignore_index=True
-            )
+            alert_store.append_row(store, new_row)
 
             st.session_state["created_request_id"] = next_id
+            st.rerun(scope="app")
 
         # ================= AUTO FIELDS (very last) =================
         with st.expander("Show Auto-filled Fields", expanded=False):
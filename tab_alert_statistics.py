@@ -1,92 +1,82 @@
 import streamlit as st
-import pandas as pd
-import plotly.express as px
 
+import analytics
+import figures
+import filters
 
-def render(df_filtered):
+
+def render(df_filtered, period_counts, people_roles, view_key):
 
     st.subheader("Alert Statistics")
 
     if df_filtered.empty:
         st.warning("No data available for selected filters.")
-        st.stop()
+        return
 
-    df_filtered["MonthDisplay"] = df_filtered["deviationTime"].dt.strftime("%B %Y")
-    df_filtered["MonthSort"] = df_filtered["deviationTime"].dt.to_period("M")
+    result_cache = st.session_state["result_cache"]
 
-    month_df = (
-        df_filtered[["MonthDisplay", "MonthSort"]]
-        .drop_duplicates()
-        .sort_values("MonthSort")
+    month_codes, month_labels = analytics.cached(
+        result_cache, view_key + ("months",), lambda: analytics.months(period_counts)
     )
-
-    month_options = ["All"] + month_df["MonthDisplay"].tolist()
+    month_options  = ["All"] + month_labels
     selected_month = st.selectbox("Select Month", month_options, index=0, key="month_select")
 
-    if selected_month == "All":
-        df_month = df_filtered.copy()
-    else:
-        df_month = df_filtered[df_filtered["MonthDisplay"] == selected_month]
-
-    status_lower = df_month["status"].str.lower()
-
-    total_generated = len(df_month)
-    total_closed    = df_month[status_lower.str.contains("closed", na=False)].shape[0]
-    total_active    = total_generated - total_closed
-    pending         = df_month[status_lower.str.contains("pending", na=False)].shape[0]
-    implemented     = df_month[status_lower.str.contains("implemented", na=False)].shape[0]
-    rejected        = df_month[status_lower.str.contains("rejected", na=False)].shape[0]
-    wip             = df_month[status_lower.str.contains("progress", na=False)].shape[0]
-    overdue         = df_month[status_lower.str.contains("overdue", na=False)].shape[0]
-    auto_closed     = df_month[df_month["status"].str.contains("System", case=False, na=False)].shape[0]
-    overdue_3       = df_month[
-        (status_lower.str.contains("overdue", na=False)) &
-        ((pd.Timestamp.today() - df_month["deviationTime"]).dt.days > 3)
-    ].shape[0]
-    target_revision = total_active
+    month_code = None if selected_month == "All" else month_codes[month_labels.index(selected_month)]
+    month_counts = analytics.cached(
+        result_cache, view_key + (month_code, "month_counts"),
+        lambda: analytics.month_counts(period_counts, month_code)
+    )
+
+    def month_statistics():
+        lo, hi = analytics.month_bounds(df_filtered, month_code)
+        return analytics.statistics(df_filtered.iloc[lo:hi], month_counts)
+
+    metrics = analytics.cached(
+        result_cache, view_key + (month_code, "statistics"), month_statistics
+    )
 
     col1, col2, col3 = st.columns(3)
-    col1.metric("Total Generated Alerts", total_generated)
-    col2.metric("Total Active",           total_active)
-    col3.metric("Total Closed",           total_closed)
+    col1.metric("Total Generated Alerts", metrics["total_generated"])
+    col2.metric("Total Active",           metrics["total_active"])
+    col3.metric("Total Closed",           metrics["total_closed"])
 
     st.markdown("---")
 
     col1, col2 = st.columns(2)
-    col1.metric("Pending",     pending)
-    col2.metric("Implemented", implemented)
+    col1.metric("Pending",     metrics["pending"])
+    col2.metric("Implemented", metrics["implemented"])
 
     col1, col2 = st.columns(2)
-    col1.metric("Work In Progress", wip)
-    col2.metric("Rejected",         rejected)
+    col1.metric("Work In Progress", metrics["wip"])
+    col2.metric("Rejected",         metrics["rejected"])
 
     col1, col2 = st.columns(2)
-    col1.metric("Overdue",     overdue)
-    col2.metric("Auto Closed", auto_closed)
+    col1.metric("Overdue",     metrics["overdue"])
+    col2.metric("Auto Closed", metrics["auto_closed"])
 
     col1, col2 = st.columns(2)
-    col1.metric("No. of Overdue Alerts (>3 days)",    overdue_3)
-    col2.metric("Target Date Revision (Active Alerts)", target_revision)
+    col1.metric("No. of Overdue Alerts (>3 days)",    metrics["overdue_3"])
+    col2.metric("Target Date Revision (Active Alerts)", metrics["target_revision"])
 
     st.markdown("---")
     st.markdown("### Active Alerts by Role")
 
-    df_active_month = df_month[~status_lower.str.contains("closed", na=False)].copy()
-
-    role_df = (
-        df_active_month
-        .groupby("Role")
-        .size()
-        .reset_index(name="Count")
-        .sort_values("Count", ascending=False)
+    # Built from the per-role counts and reused until data, filter, month or
+    # roles change
+    roles_key   = filters.roles_key(people_roles)
+    role_counts = analytics.cached(
+        result_cache, view_key + (month_code, roles_key, "active_by_role"),
+        lambda: analytics.active_by_role(month_counts, people_roles)
     )
 
-    if not role_df.empty:
-        fig_role = px.bar(role_df, x="Role", y="Count", text="Count")
-        fig_role.update_layout(
-            xaxis_title="Role",
-            yaxis_title="Active Alerts",
-            xaxis=dict(type="category")
+    if not role_counts.empty:
+        fig_role = figures.cached(
+            st.session_state["figure_cache"],
+            view_key + (selected_month, roles_key, "statistics_by_role"),
+            lambda: figures.bar(
+                role_counts.index, role_counts.to_numpy(),
+                xaxis_title="Role", yaxis_title="Active Alerts"
+            )
         )
         st.plotly_chart(fig_role, use_container_width=True)
     else:
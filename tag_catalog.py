@@ -0,0 +1,71 @@
+from bisect import insort
+
+import pandas as pd
+
+import schema
+
+# ================= TAG CATALOG =================
+# Per cause tag, the first known value of each metadata column, built in one
+# grouped pass when the data loads. The alert store pushes create/update
+# deltas and only the tags those rows carry are touched; an update carries
+# the old row's metadata forward, so removed rows never take a value away.
+#
+# The Create Alert form also gets each system's sorted tags and the latest
+# deviationTime per (system, tag); updates stamp the current time, so a
+# removed row version can never hold the maximum either.
+FIELDS = ["causeMessage", "suggestion", "causeUom", "odsCauseTagID"]
+
+
+def build_catalog(df):
+    fields = [f for f in FIELDS if f in df.columns]
+    tagged = df[df["odsCauseTagName"].notna()]
+    first  = tagged.groupby("odsCauseTagName", observed=True, sort=False)[fields].first()
+    pairs = (
+        tagged[tagged["systemName"].notna()]
+        .groupby(["systemName", "odsCauseTagName"], observed=True, sort=False)["deviationTime"]
+        .max()
+    )
+    tags_by_system = {}
+    for system, tag in pairs.index:
+        tags_by_system.setdefault(system, []).append(tag)
+
+    return {
+        "fields":          {f: first[f].dropna().to_dict() for f in fields},
+        "tags_by_system":  {s: schema.sorted_labels(t) for s, t in tags_by_system.items()},
+        "last_occurrence": pairs.dropna().to_dict(),
+    }
+
+
+def apply_delta(catalog, removed=(), added=()):
+    for row in added:
+        tag = row.get("odsCauseTagName")
+        if pd.isna(tag):
+            continue
+        for field, values in catalog["fields"].items():
+            value = row.get(field)
+            if tag not in values and not pd.isna(value):
+                values[tag] = value
+
+        system = row.get("systemName")
+        if pd.isna(system):
+            continue
+        tags = catalog["tags_by_system"].setdefault(system, [])
+        if tag not in tags:
+            insort(tags, tag)
+
+        time = pd.to_datetime(row.get("deviationTime"), errors="coerce")
+        last = catalog["last_occurrence"].get((system, tag))
+        if not pd.isna(time) and (last is None or time > last):
+            catalog["last_occurrence"][(system, tag)] = time
+
+
+def lookup(catalog, field, tag, default=""):
+    return catalog["fields"].get(field, {}).get(tag, default)
+
+
+def tags_for_system(catalog, system):
+    return catalog["tags_by_system"].get(system, [])
+
+
+def last_occurrence(catalog, system, tag, default="N/A"):
+    return catalog["last_occurrence"].get((system, tag), default)
@@ -0,0 +1,61 @@
+import json
+import os
+import re
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+import schema
+
+# ================= TAG CATEGORIES =================
+# Alert Management groups cause tags into categories by case-insensitive
+# regex rules. Each distinct tag is matched once and reduced to a bitmask
+# (a tag can fall into several categories); rows are then classified by
+# looking their category code up in that table, as for status classes.
+#
+# The rules can be replaced with a JSON object of {category: pattern} in
+# the file named by ALERT_CATEGORY_RULES.
+DEFAULT_RULES = {
+    "Energy":      "energy",
+    "Production":  "production|throughput|rate|capacity|output",
+    "Environment": "environment|emission|flare|co2|pollution",
+}
+
+
+def load_rules(path=None):
+    path = path or os.environ.get("ALERT_CATEGORY_RULES")
+    if not path:
+        return dict(DEFAULT_RULES)
+    with open(path, encoding="utf-8") as f:
+        return {str(name): str(pattern) for name, pattern in json.load(f).items()}
+
+
+RULES = load_rules()
+
+PATTERNS = {name: re.compile(pattern, re.IGNORECASE) for name, pattern in RULES.items()}
+BITS     = {name: 1 << i for i, name in enumerate(RULES)}
+
+
+def names():
+    return list(RULES)
+
+
+@lru_cache(maxsize=None)
+def label_bits(label):
+    if pd.isna(label):
+        return 0
+    text = str(label)
+    bits = 0
+    for name, pattern in PATTERNS.items():
+        if pattern.search(text):
+            bits |= BITS[name]
+    return bits
+
+
+def row_bits(tags):
+    return schema.category_lookup(tags, label_bits, np.uint32)
+
+
+def in_category(tags, name):
+    return (row_bits(tags) & BITS[name]) != 0
@@ -0,0 +1,17 @@
+import os
+import sys
+
+import pytest
+
+# The dashboard modules live flat in the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import schema  # noqa: E402
+import synthetic_export  # noqa: E402
+
+
+@pytest.fixture
+def alerts():
+    # A small export as the loader hands it over: typed and in time order
+    df = synthetic_export.generate_alerts(400, systems=4, tags=30, assignees=6, days=120, seed=7)
+    return schema.sort_by_time(schema.coerce_alert_schema(df), reset_index=True)
@@ -0,0 +1,158 @@
+import json
+import threading
+
+import pandas as pd
+import pytest
+
+import alert_journal
+import alert_store
+import analytics
+import data_loader
+
+KEY = "dataset"
+
+
+@pytest.fixture(autouse=True)
+def sidecar_dir(tmp_path, monkeypatch):
+    # A fresh directory and no journal state shared from other tests; a
+    # cleared _shared also stands in for a process restart
+    monkeypatch.setattr(data_loader, "SIDECAR_DIR", str(tmp_path))
+    monkeypatch.setattr(alert_journal, "_shared", {})
+    return tmp_path
+
+
+def _restart():
+    alert_journal._shared.clear()
+
+
+def _mappings(prefix):
+    systems   = {f"SYSTEM {i:02d}": f"{prefix} System {i}" for i in range(4)}
+    assignees = {f"Person {i:03d}": f"{prefix} Person {i}" for i in range(6)}
+    return systems, assignees
+
+
+def _raw(mapping, display):
+    return {shown: raw for raw, shown in mapping.items()}.get(display, display)
+
+
+def test_replay_round_trips_under_new_mappings(alerts):
+    systems, assignees = _mappings("Old")
+    store = analytics.load_dataset(alerts, KEY, systems, assignees)["store"]
+    created = alert_store.next_request_id(store)
+    alert_store.append_row(store, {
+        "requestID":       created,
+        "systemName":      "Old System 2",
+        "status":          "Pending",
+        "currentAssignee": "Old Person 1",
+        "deviationTime":   pd.Timestamp("2024-03-01 08:30"),
+        "comments":        "created",
+    })
+    edited = alert_store.request_ids(store)[:3]
+    for request_id in edited:
+        alert_store.update_row(store, request_id, {"status": "Closed", "currentAssignee": "Old Person 4"})
+    alert_store.update_row(store, created, {"status": "Implemented"})
+    before = alert_store.to_frame(store)
+
+    _restart()
+    new_systems, new_assignees = _mappings("New")
+    replayed = analytics.load_dataset(alerts, KEY, new_systems, new_assignees)["store"]
+    after = alert_store.to_frame(replayed)
+
+    assert len(after) == len(before)
+    for request_id in list(edited) + [created]:
+        old = alert_store.get_row(store, request_id)
+        new = alert_store.get_row(replayed, request_id)
+        assert new["status"] == old["status"]
+        assert new["comments"] == old["comments"]
+        assert pd.Timestamp(new["deviationTime"]) == pd.Timestamp(old["deviationTime"])
+        assert new["systemName"] == new_systems[_raw(systems, old["systemName"])]
+        assert new["currentAssignee"] == new_assignees[_raw(assignees, old["currentAssignee"])]
+
+
+def test_sessions_on_one_dataset_never_merge_alerts(alerts):
+    sessions = [analytics.load_dataset(alerts, KEY, {}, {})["store"] for _ in range(2)]
+    for n, store in enumerate(sessions):
+        alert_store.append_row(store, {
+            "requestID":       alert_store.next_request_id(store),
+            "systemName":      "SYSTEM 01",
+            "status":          "Pending",
+            "currentAssignee": "Person 001",
+            "deviationTime":   pd.Timestamp("2024-03-01"),
+            "comments":        f"session {n}",
+        })
+
+    _restart()
+    replayed = alert_store.to_frame(analytics.load_dataset(alerts, KEY, {}, {})["store"])
+
+    assert len(replayed) == len(alerts) + 2
+    created = replayed[replayed["requestID"] > len(alerts)]
+    assert sorted(created["comments"]) == ["session 0", "session 1"]
+    assert replayed["requestID"].is_unique
+
+
+def test_compaction_keeps_creates_with_a_reused_id(alerts, sidecar_dir):
+    # A log written before IDs were shared can hold two creates of one ID
+    def line(comments, op):
+        return json.dumps({
+            "requestID": 9001, "systemName": "SYSTEM 01", "status": "Pending",
+            "currentAssignee": "Person 001", "deviationTime": "2024-03-01T00:00:00", "comments": comments, "_op": op,
+        })
+
+    path = alert_journal.journal_path(KEY)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n".join([line("a", "create"), line("b", "create"), line("b2", "update")]) + "\n")
+
+    alert_journal.compact(path)
+    with open(path, encoding="utf-8") as f:
+        assert len(f.readlines()) == 2
+
+    replayed = alert_store.to_frame(analytics.load_dataset(alerts, KEY, {}, {})["store"])
+    assert sorted(replayed.loc[replayed["requestID"] == 9001, "comments"]) == ["a", "b2"]
+
+
+def test_write_errors_are_reported_not_raised(alerts, sidecar_dir):
+    loaded = analytics.load_dataset(alerts, KEY, {}, {})
+    blocker = sidecar_dir / "not-a-directory"
+    blocker.write_text("")
+    loaded["journal"]["path"] = str(blocker / "journal.jsonl")
+
+    store = loaded["store"]
+    alert_store.update_row(store, alert_store.request_ids(store)[0], {"status": "Closed"})
+
+    assert alert_journal.last_error(loaded["journal"])
+    assert alert_store.get_row(store, alert_store.request_ids(store)[0])["status"] == "Closed"
+
+
+def test_compaction_waits_until_it_would_shrink_the_log(alerts, monkeypatch):
+    started = []
+    monkeypatch.setattr(alert_journal, "COMPACT_MIN_LINES", 10)
+    monkeypatch.setattr(alert_journal, "compact", started.append)
+    loaded = analytics.load_dataset(alerts, KEY, {}, {})
+    store  = loaded["store"]
+    ids    = alert_store.request_ids(store)
+
+    # One line per alert: a rewrite would not drop anything
+    for request_id in ids[:30]:
+        alert_store.update_row(store, request_id, {"status": "Closed"})
+    assert started == []
+
+    for _ in range(40):
+        alert_store.update_row(store, ids[0], {"comments": "again"})
+    for thread in threading.enumerate():
+        if thread.name == "alert-journal":
+            thread.join()
+    assert started == [loaded["journal"]["path"]]
+
+
+def test_replay_skips_a_torn_final_line(alerts):
+    loaded = analytics.load_dataset(alerts, KEY, {}, {})
+    store  = loaded["store"]
+    edited = alert_store.request_ids(store)[0]
+    alert_store.update_row(store, edited, {"status": "Closed"})
+    with open(loaded["journal"]["path"], "a", encoding="utf-8") as f:
+        f.write('{"requestID": 1, "status": "Rej')
+
+    _restart()
+    replayed = analytics.load_dataset(alerts, KEY, {}, {})["store"]
+    assert alert_store.get_row(replayed, edited)["status"] == "Closed"
+    assert len(alert_store.to_frame(replayed)) == len(alerts)
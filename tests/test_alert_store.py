@@ -0,0 +1,146 @@
+import pandas as pd
+import pandas.testing as pdt
+
+import aggregates
+import alert_store
+import tag_catalog
+
+
+def _canonical_counts(counts):
+    columns = aggregates.DIMENSIONS + ["count", "month"]
+    return (
+        counts[columns]
+        .astype({c: object for c in aggregates.DIMENSIONS[1:]})
+        .sort_values(aggregates.DIMENSIONS, ignore_index=True)
+    )
+
+
+def _edit(store, rounds=3):
+    # Creates, updates of base rows, updates of created rows and repeated
+    # updates of one alert, as the Alert Configuration tab makes them
+    ids = list(alert_store.request_ids(store))
+    for n in range(rounds):
+        request_id = alert_store.next_request_id(store)
+        alert_store.append_row(store, {
+            "requestID":       request_id,
+            "systemName":      "SYSTEM 01",
+            "odsCauseTagName": f"NEW_TAG_{n}",
+            "causeMessage":    f"New cause {n}",
+            "status":          "Pending",
+            "currentAssignee": "Person 002",
+            "deviationTime":   pd.Timestamp("2024-03-01") + pd.Timedelta(days=n),
+        })
+        alert_store.update_row(store, request_id, {"status": "Work In Progress"})
+        for base_id in ids[n * 5:(n + 1) * 5]:
+            alert_store.update_row(store, base_id, {
+                "status":          "Closed",
+                "currentAssignee": "Person 003",
+                "deviationTime":   pd.Timestamp("2024-05-01"),
+                "comments":        f"round {n}",
+            })
+        alert_store.update_row(store, ids[0], {"comments": f"again {n}"})
+
+
+def test_cube_deltas_match_a_rebuild(alerts):
+    store = alert_store.new_store(alerts)
+    cube  = aggregates.build_cube(store["base"])
+    alert_store.subscribe(store, lambda removed, added: aggregates.apply_delta(cube, removed, added))
+
+    _edit(store)
+
+    expected = aggregates.build_cube(alert_store.to_frame(store))["counts"]
+    pdt.assert_frame_equal(
+        _canonical_counts(aggregates.cube_counts(cube)), _canonical_counts(expected),
+        check_dtype=False
+    )
+
+
+def test_cube_slices_add_the_unfolded_delta(alerts):
+    store = alert_store.new_store(alerts)
+    cube  = aggregates.build_cube(store["base"])
+    alert_store.subscribe(store, lambda removed, added: aggregates.apply_delta(cube, removed, added))
+    folded = cube["counts"]
+
+    _edit(store)
+
+    expected = aggregates.build_cube(alert_store.to_frame(store))
+    for system in ("All", "SYSTEM 01"):
+        got  = aggregates.slice_cube(cube, "2024-02-15", "2024-06-30", system)
+        want = aggregates.slice_cube(expected, "2024-02-15", "2024-06-30", system)
+        assert len(want) and got["day"].is_monotonic_increasing
+        pdt.assert_frame_equal(
+            _canonical_counts(aggregates.merge_counts([got])), _canonical_counts(want),
+            check_dtype=False
+        )
+    # A handful of edits stays in the delta; the cube itself is untouched
+    assert cube["counts"] is folded and cube["delta"] is not None
+
+
+def test_catalog_deltas_match_a_rebuild(alerts):
+    store   = alert_store.new_store(alerts)
+    catalog = tag_catalog.build_catalog(store["base"])
+    alert_store.subscribe(store, lambda removed, added: tag_catalog.apply_delta(catalog, removed, added))
+
+    _edit(store)
+
+    assert catalog == tag_catalog.build_catalog(alert_store.to_frame(store))
+
+
+def test_batched_changes_match_single_edits(alerts):
+    single = alert_store.new_store(alerts)
+    batch  = alert_store.new_store(alerts)
+    ids    = alert_store.request_ids(single)[:10]
+    created = {"requestID": 9001, "systemName": "SYSTEM 02", "status": "Pending",
+               "deviationTime": pd.Timestamp("2024-02-01")}
+
+    alert_store.append_row(single, created)
+    for request_id in ids:
+        alert_store.update_row(single, request_id, {"requestID": request_id, "status": "Closed"})
+
+    versions = []
+    alert_store.subscribe(batch, lambda removed, added: versions.append((len(removed), len(added))))
+    alert_store.apply_changes(
+        batch, created=[created], updated=[{"requestID": i, "status": "Closed"} for i in ids]
+    )
+
+    assert versions == [(10, 11)]
+    pdt.assert_frame_equal(alert_store.to_frame(batch), alert_store.to_frame(single))
+
+
+def test_compaction_keeps_index_and_ids_consistent(alerts, monkeypatch):
+    monkeypatch.setattr(alert_store, "COMPACT_MIN_ROWS", 8)
+    monkeypatch.setattr(alert_store, "COMPACT_RATIO", 100)
+    store = alert_store.new_store(alerts)
+    cube  = aggregates.build_cube(store["base"])
+    alert_store.subscribe(store, lambda removed, added: aggregates.apply_delta(cube, removed, added))
+
+    _edit(store, rounds=4)
+    assert store["generation"] > 0
+
+    frame = alert_store.to_frame(store)
+    assert alert_store.request_ids(store) == sorted(frame["requestID"].dropna().unique().tolist())
+    for request_id in alert_store.request_ids(store):
+        assert alert_store.get_row(store, request_id)["requestID"] == request_id
+
+    first = alert_store.request_ids(store)[0]
+    assert alert_store.get_row(store, first)["comments"] == "again 3"
+
+    # Edits after compaction land on the compacted rows
+    alert_store.update_row(store, first, {"status": "Rejected"})
+    assert alert_store.get_row(store, first)["status"] == "Rejected"
+    assert len(alert_store.to_frame(store)) == len(frame)
+    pdt.assert_frame_equal(
+        _canonical_counts(aggregates.cube_counts(cube)),
+        _canonical_counts(aggregates.build_cube(alert_store.to_frame(store))["counts"]),
+        check_dtype=False
+    )
+
+
+def test_stores_sharing_a_counter_never_reuse_an_id(alerts):
+    first, second = alert_store.new_store(alerts), alert_store.new_store(alerts)
+    counter = alert_store.new_id_counter()
+    alert_store.share_id_counter(first, counter)
+    alert_store.share_id_counter(second, counter)
+
+    ids = {alert_store.next_request_id(first), alert_store.next_request_id(second)}
+    assert ids == {len(alerts) + 1, len(alerts) + 2}
@@ -0,0 +1,56 @@
+from io import BytesIO
+
+import pandas as pd
+import pytest
+from openpyxl import Workbook
+
+import data_loader
+import query_engine
+
+COLUMNS = ["requestID", "systemName", "status", "currentAssignee", "deviationTime"]
+ROWS = [
+    [1, "SYSTEM 01", "Pending", "Person 001", "2024-03-01 08:00:00"],
+    [2, "SYSTEM 02", "Closed",  "Person 002", "2024-03-02 09:30:00"],
+]
+
+
+def _csv(title):
+    lines = [",".join(COLUMNS)] + [",".join(str(v) for v in row) for row in ROWS]
+    if title is not None:
+        lines.insert(0, title)
+    return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def _xlsx(title):
+    wb = Workbook()
+    ws = wb.active
+    if title is not None:
+        ws.append([title])
+    ws.append(COLUMNS)
+    for row in ROWS:
+        ws.append(row)
+    output = BytesIO()
+    wb.save(output)
+    return output.getvalue()
+
+
+def _check(df):
+    assert list(df.columns) == COLUMNS
+    assert df["requestID"].tolist() == [1, 2]
+    assert df["deviationTime"].tolist() == [pd.Timestamp("2024-03-01 08:00"), pd.Timestamp("2024-03-02 09:30")]
+
+
+@pytest.mark.parametrize("title", ["Alert Export", "Alert Export,,,,", None])
+def test_csv_header_row_is_found(title):
+    _check(data_loader.parse_alert_csv(_csv(title)))
+
+
+@pytest.mark.parametrize("title", ["Alert Export", None])
+def test_workbook_header_row_is_found(title):
+    _check(data_loader.parse_alert_workbook(_xlsx(title)))
+
+
+def test_derived_files_carry_the_format_version():
+    version = f".v{data_loader.FORMAT_VERSION}."
+    assert version in data_loader.sidecar_path("abc")
+    assert version in query_engine.database_path("abc")
@@ -0,0 +1,41 @@
+from io import BytesIO
+
+import pandas as pd
+
+import alert_store
+import export
+import filters
+
+
+def test_created_alerts_export_in_every_format(alerts):
+    # Form fields arrive as text, as the Alert Configuration tab sends them
+    store = alert_store.new_store(alerts)
+    request_id = alert_store.next_request_id(store)
+    alert_store.append_row(store, {
+        "requestID":         request_id,
+        "systemName":        "SYSTEM 01",
+        "odsCauseTagName":   "NEW_TAG",
+        "odsCauseTagID":     4242,
+        "causeMessage":      "New cause",
+        "causeValueActual":  "12.5",
+        "causeValueOptimum": "10",
+        "gap":               2.5,
+        "lastOccurrence":    "N/A",
+        "deviationTime":     pd.Timestamp("2024-03-01"),
+        "status":            "Pending",
+        "dueDate":           "2024-04-01",
+        "currentAssignee":   "Person 002",
+        "comments":          "",
+    })
+    df = filters.with_role(alert_store.to_frame(store), {"Person 002": "Engineer"})
+
+    for fmt in export.format_names():
+        data = export.WRITERS[fmt](df)
+        assert data, fmt
+
+    if "Parquet" in export.format_names():
+        read = pd.read_parquet(BytesIO(export.to_parquet(df)))
+        created = read[read["requestID"] == request_id]
+        assert len(read) == len(df)
+        assert created["causeValueActual"].tolist() == [12.5]
+        assert created["causeValueOptimum"].tolist() == [10.0]
@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+
+import alert_store
+import filters
+import schema
+
+ROLES = {"Person 001": "Process Engineer"}
+
+
+def _expected(store, start, end, system):
+    frame = alert_store.to_frame(store)
+    times = frame["deviationTime"]
+    keep  = (times >= pd.Timestamp(start)) & (times < pd.Timestamp(end) + pd.Timedelta(days=1))
+    if system != "All":
+        keep &= frame["systemName"] == system
+    return frame[keep.to_numpy()]
+
+
+def test_filtered_view_skips_tombstones_and_missing_times(alerts):
+    # Rows without a deviationTime sort last and belong to no period
+    alerts = alerts.copy()
+    alerts.loc[alerts.index[::37], "deviationTime"] = pd.NaT
+    store = alert_store.new_store(schema.sort_by_time(alerts, reset_index=True))
+
+    # Updates tombstone base rows; their new versions live in the tail
+    ids = alert_store.request_ids(store)
+    for request_id in ids[:40:3]:
+        alert_store.update_row(store, request_id, {"status": "Closed"})
+    for request_id in ids[1:40:5]:
+        alert_store.update_row(store, request_id, {"deviationTime": pd.NaT})
+
+    cache = filters.new_cache()
+    filters.refresh(cache, store, ROLES)
+    for start, end in [("2024-01-01", "2024-04-30"), ("2024-02-03", "2024-02-20")]:
+        for system in ("All", "SYSTEM 02"):
+            view     = filters.filtered_view(cache, store, start, end, system)
+            expected = _expected(store, start, end, system)
+
+            assert sorted(view["requestID"]) == sorted(expected["requestID"])
+            assert not view["deviationTime"].isna().any()
+            assert view["deviationTime"].is_monotonic_increasing
+            closed = view[view["requestID"].isin(ids[:40:3])]
+            assert (closed["status"] == "Closed").all()
+
+
+def test_system_positions_stay_inside_the_period(alerts):
+    cache = filters.new_cache()
+    store = alert_store.new_store(alerts)
+    filters.refresh(cache, store, ROLES)
+
+    positions = filters.filter_positions(cache, "2024-02-01", "2024-02-29", "SYSTEM 01")
+    rows = alerts.iloc[positions]
+    assert len(rows) == len(_expected(store, "2024-02-01", "2024-02-29", "SYSTEM 01"))
+    assert np.all(np.diff(positions) > 0)
+    assert (rows["systemName"] == "SYSTEM 01").all()
+    assert rows["deviationTime"].between("2024-02-01", "2024-02-29 23:59:59").all()
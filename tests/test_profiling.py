@@ -0,0 +1,36 @@
+import threading
+import tracemalloc
+
+import profiling
+
+
+def _in_thread(fn):
+    result = []
+    thread = threading.Thread(target=lambda: result.append(fn()))
+    thread.start()
+    thread.join()
+    return result[0] if result else None
+
+
+def test_rerun_on_a_new_thread_releases_an_interrupted_run():
+    state = {}
+    _in_thread(lambda: profiling.start_run(state, enabled=True))
+    assert tracemalloc.is_tracing()
+
+    # The next rerun runs on another thread with profiling switched off
+    _in_thread(lambda: profiling.start_run(state, enabled=False))
+    assert not tracemalloc.is_tracing()
+    assert profiling.RUN_KEY not in state
+
+
+def test_finished_run_reports_its_spans():
+    state = {}
+    profiling.start_run(state, enabled=True)
+    with profiling.span("outer"):
+        with profiling.span("inner"):
+            pass
+    profile = profiling.finish_run(state)
+
+    assert not tracemalloc.is_tracing()
+    assert [s["path"] for s in profile["spans"]] == [("outer",), ("outer", "inner")]
+    assert profiling.finish_run(state) is None
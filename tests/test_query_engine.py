@@ -0,0 +1,58 @@
+import pandas as pd
+import pandas.testing as pdt
+import pytest
+
+import aggregates
+import alert_journal
+import alert_store
+import analytics
+import data_loader
+import query_engine
+
+
+@pytest.fixture(autouse=True)
+def sidecar_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(data_loader, "SIDECAR_DIR", str(tmp_path))
+    monkeypatch.setattr(alert_journal, "_shared", {})
+    return tmp_path
+
+
+def _canonical(counts):
+    counts = aggregates.merge_counts([counts])
+    return (
+        counts[aggregates.DIMENSIONS + ["count"]]
+        .astype({c: object for c in aggregates.DIMENSIONS[1:]})
+        .sort_values(aggregates.DIMENSIONS, ignore_index=True)
+    )
+
+
+def test_sqlite_counts_match_pandas(alerts):
+    # Display names differ from the raw ones and the sessions hold edits, so
+    # the SQLite results go through name mapping and the delta cube
+    systems   = {f"SYSTEM {i:02d}": f"Unit {i}" for i in range(4)}
+    assignees = {f"Person {i:03d}": f"Engineer {i}" for i in range(6)}
+    loaded = {
+        name: analytics.load_dataset(alerts, f"dataset-{name}", systems, assignees, engine_name=name)
+        for name in query_engine.ENGINES
+    }
+    for name, dataset in loaded.items():
+        store = dataset["store"]
+        for request_id in alert_store.request_ids(store)[:20]:
+            alert_store.update_row(store, request_id, {
+                "status":          "Closed",
+                "currentAssignee": "Engineer 1",
+                "deviationTime":   pd.Timestamp("2024-02-10"),
+            })
+
+    start, end = alerts["deviationTime"].min(), alerts["deviationTime"].max()
+    mid = start + (end - start) / 2
+    for period in [(start, end), (start, mid), (mid, end)]:
+        for system in ("All", "Unit 2"):
+            pandas_counts, sqlite_counts = (
+                query_engine.period_counts(loaded[name]["engine"], *period, system)
+                for name in query_engine.ENGINES
+            )
+            assert len(pandas_counts)
+            pdt.assert_frame_equal(
+                _canonical(sqlite_counts), _canonical(pandas_counts), check_dtype=False
+            )
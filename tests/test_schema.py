@@ -0,0 +1,24 @@
+import numpy as np
+import pandas as pd
+
+import schema
+
+
+def test_order_keeping_renames_reuse_the_codes():
+    series = pd.Series(["a", "b", None, "c", "a"], dtype="category")
+    remapped = schema.remap_categorical(series, {"a": "A1", "b": "B1", "c": "C1"})
+
+    np.testing.assert_array_equal(remapped.cat.codes.to_numpy(), series.cat.codes.to_numpy())
+    assert remapped.tolist()[:2] == ["A1", "B1"] and pd.isna(remapped.iloc[2])
+    assert list(remapped.cat.categories) == ["A1", "B1", "C1"]
+
+
+def test_merging_and_reordering_renames_recode():
+    series = pd.Series(["a", "b", None, "c", "a"], dtype="category")
+
+    merged = schema.remap_categorical(series, {"a": "z", "b": "x", "c": "x"})
+    assert merged.astype(object).tolist() == ["z", "x", np.nan, "x", "z"]
+    assert list(merged.cat.categories) == ["x", "z"]
+
+    defaulted = schema.remap_categorical(series, {"a": "A"}, default="Other")
+    assert defaulted.tolist() == ["A", "Other", "Other", "Other", "A"]
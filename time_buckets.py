@@ -0,0 +1,36 @@
+import numpy as np
+import pandas as pd
+
+# ================= TIME BUCKETS =================
+# Day and month buckets as integer codes counted from the Unix epoch,
+# computed with datetime64 unit casts rather than per-row formatting.
+# Labels and bounds are only produced for the few distinct codes shown.
+
+
+def day_codes(times):
+    return np.asarray(times).astype("datetime64[D]").astype(np.int64)
+
+
+def month_codes(times):
+    return np.asarray(times).astype("datetime64[M]").astype(np.int64)
+
+
+def distinct_sorted(codes):
+    # Codes from day-ordered data are already sorted
+    codes = np.asarray(codes)
+    if len(codes) == 0:
+        return codes
+    return codes[np.r_[True, codes[1:] != codes[:-1]]]
+
+
+def month_start(code):
+    return pd.Timestamp(np.datetime64(int(code), "M"))
+
+
+def month_label(code):
+    return month_start(code).strftime("%B %Y")
+
+
+def month_days(code):
+    # First and last day of the month, inclusive
+    return month_start(code), month_start(code + 1) - pd.Timedelta(days=1)